@@ -9,6 +9,7 @@ from app.config import FIREBASE_CREDENTIALS_PATH, FIREBASE_PROJECT_ID
 import os
 
 db = None
+watch_db = None
 
 print(f"🔥 Initializing Firebase...")
 print(f"   Credentials: {FIREBASE_CREDENTIALS_PATH}")
@@ -34,9 +35,17 @@ try:
     )
     print("✓ Firestore AsyncClient created")
     
+    # Sync client for snapshot listeners (the async client has no on_snapshot)
+    watch_db = firestore.Client(
+        project=FIREBASE_PROJECT_ID,
+        credentials=firestore_credentials
+    )
+    print("✓ Firestore watch Client created")
+    
 except Exception as e:
     print(f"❌ Firebase initialization failed: {e}")
     db = None
+    watch_db = None
     raise
 
 print("✅ Firebase ready\n")
@@ -49,19 +58,19 @@ async def cleanup_expired_documents(collection_name: str, expiry_field: str = 'e
     
     Args:
         collection_name: Firestore collection name
-        expiry_field: Field name containing expiry timestamp
+        expiry_field: Field name containing expiry timestamp (Firestore Timestamp)
     """
-    from datetime import datetime
+    from datetime import datetime, timezone
     
     try:
         docs = db.collection(collection_name).stream()
         deleted = 0
+        now = datetime.now(timezone.utc)
         
         async for doc in docs:
             data = doc.to_dict()
             if expiry_field in data:
-                expires_at = datetime.fromisoformat(data[expiry_field])
-                if datetime.now() > expires_at:
+                if now > data[expiry_field]:
                     await db.collection(collection_name).document(doc.id).delete()
                     deleted += 1
         
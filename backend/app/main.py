@@ -10,6 +10,7 @@ from app.routes.github import router as github_router
 from app.routes.user import router as user_router
 from app.routes.rag import router as rag_router
 from app.routes.webhook import router as webhook_router
+from app.routes.webhook import start_active_sessions_listener, stop_active_sessions_listener
 from app.config import FRONTEND_URL
 
 app = FastAPI(
@@ -36,6 +37,15 @@ app.include_router(user_router)
 app.include_router(rag_router)
 app.include_router(webhook_router)
 
+# Mirror active webhook sessions in memory for the lifetime of the process
+@app.on_event("startup")
+async def startup():
+    start_active_sessions_listener()
+
+@app.on_event("shutdown")
+async def shutdown():
+    stop_active_sessions_listener()
+
 # Health check for Cloud Run
 @app.get("/health")
 async def health():
@@ -13,6 +13,7 @@ from typing import Optional, List, Dict
 from github import Github, GithubException
 import os
 import json
+import orjson
 
 from google.cloud import storage as gcs
 
@@ -127,6 +128,29 @@ def _get_commit_info(repo_full_name: str) -> Optional[Dict]:
             return None
     return None
 
+def _iter_chunks(content: bytes):
+    """Yield parsed chunks from raw chunks.jsonl bytes without splitting into a list."""
+    start = 0
+    n = len(content)
+    while start < n:
+        end = content.find(b'\n', start)
+        if end < 0:
+            end = n
+        line = content[start:end]
+        start = end + 1
+        if line.strip():
+            yield orjson.loads(line)
+
+def _get_chunk_stats(chunks_blob) -> tuple:
+    """Return (chunk_count, has_embeddings) for an existing chunks.jsonl blob."""
+    chunk_count = 0
+    embedded_count = 0
+    for chunk in _iter_chunks(chunks_blob.download_as_bytes()):
+        chunk_count += 1
+        if chunk.get('embedding'):
+            embedded_count += 1
+    return chunk_count, chunk_count > 0 and embedded_count == chunk_count
+
 def _get_commit_history(repo_full_name: str, limit: int = 10) -> List[Dict]:
     """Get commit processing history"""
     repo_path = _get_shared_repo_path(repo_full_name)
@@ -725,10 +749,7 @@ async def get_user_repo_history(
             has_embeddings = False
 
             if indexed:
-                content = chunks_blob.download_as_text()
-                chunks = [json.loads(line) for line in content.split('\n') if line.strip()]
-                chunk_count = len(chunks)
-                has_embeddings = all(c.get('embedding') for c in chunks) if chunks else False
+                chunk_count, has_embeddings = _get_chunk_stats(chunks_blob)
 
             commit_info = _get_commit_info(repo)
             preferences = _get_user_preferences(user_id, repo)
@@ -787,10 +808,7 @@ async def list_user_github_repos(
             has_embeddings = False
 
             if is_indexed:
-                content = chunks_blob.download_as_text()
-                chunks = [json.loads(line) for line in content.split('\n') if line.strip()]
-                chunk_count = len(chunks)
-                has_embeddings = all(c.get('embedding') for c in chunks) if chunks else False
+                chunk_count, has_embeddings = _get_chunk_stats(chunks_blob)
 
             repos.append({
                 'full_name': gh_repo.full_name,
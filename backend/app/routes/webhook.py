@@ -7,33 +7,126 @@ regardless of who actually pushed the code.
 """
 import hashlib
 import hmac
-import json
+import threading
+import orjson
 from fastapi import APIRouter, Request, HTTPException, status, BackgroundTasks
-from typing import Dict, Optional, List
-from datetime import datetime, timedelta
+from typing import Dict, Optional, List, Tuple
+from datetime import datetime, timedelta, timezone
 
 from app.config import GITHUB_WEBHOOK_SECRET
-from app.clients.firebase import db
+from app.clients.firebase import db, watch_db
 
 router = APIRouter(prefix="/webhook", tags=["Webhooks"])
 
 # Firestore collection for active sessions
 ACTIVE_SESSIONS_COLLECTION = "active_webhook_sessions"
 
+# Webhook secret encoded once for HMAC verification
+_WEBHOOK_SECRET_BYTES = GITHUB_WEBHOOK_SECRET.encode('utf-8') if GITHUB_WEBHOOK_SECRET else None
+
+# Field masks so session scans only fetch the fields they actually read
+COLLABORATOR_LOOKUP_FIELDS = ['expires_at', 'github_username', 'github_access_token', 'user_id', 'installation_id']
+SESSION_LISTING_FIELDS = ['expires_at', 'github_username', 'user_id', 'logged_in_at', 'installation_id']
+
+# Process-local mirror of active sessions, kept current by a Firestore
+# snapshot listener (see start_active_sessions_listener)
+_active_sessions: Dict[str, dict] = {}
+_sessions_watch = None
+# Set once the first snapshot has populated the mirror; until then (and after
+# the watch closes) lookups go to Firestore directly
+_sessions_ready = threading.Event()
+
+
+def _on_sessions_snapshot(docs, changes, read_time):
+    """Apply Firestore snapshot deltas to the local session mirror."""
+    for change in changes:
+        if change.type.name == 'REMOVED':
+            _active_sessions.pop(change.document.id, None)
+        else:
+            _active_sessions[change.document.id] = change.document.to_dict()
+    _sessions_ready.set()
+
+
+def start_active_sessions_listener():
+    """Subscribe to unexpired sessions so webhook lookups skip Firestore reads."""
+    global _sessions_watch
+    
+    if _sessions_watch is not None or watch_db is None:
+        return
+    
+    try:
+        query = watch_db.collection(ACTIVE_SESSIONS_COLLECTION).where(
+            'expires_at', '>', datetime.now(timezone.utc)
+        )
+        _sessions_watch = query.on_snapshot(_on_sessions_snapshot)
+        print(f"✓ Listening for changes on {ACTIVE_SESSIONS_COLLECTION}")
+    except Exception as e:
+        print(f"⚠️  Session listener failed to start, falling back to queries: {e}")
+        _sessions_watch = None
+
+
+def stop_active_sessions_listener():
+    """Unsubscribe the session listener and drop the local mirror."""
+    global _sessions_watch
+    
+    _sessions_ready.clear()
+    if _sessions_watch is not None:
+        _sessions_watch.unsubscribe()
+        _sessions_watch = None
+    _active_sessions.clear()
+
+
+def _sessions_mirror_ready() -> bool:
+    """Whether the local mirror can be trusted; re-subscribes if the watch has closed."""
+    if _sessions_watch is None:
+        return False
+    
+    if not _sessions_watch.is_active:
+        # The watch shuts itself down on unrecoverable errors; drop the stale
+        # mirror and subscribe again, querying Firestore until it is ready
+        print(f"⚠️  Session listener closed, re-subscribing to {ACTIVE_SESSIONS_COLLECTION}")
+        stop_active_sessions_listener()
+        start_active_sessions_listener()
+        return False
+    
+    return _sessions_ready.is_set()
+
+
+async def _iter_active_sessions():
+    """Yield unexpired sessions, from the local mirror once the listener has synced."""
+    now = datetime.now(timezone.utc)
+    
+    if _sessions_mirror_ready():
+        for session_data in list(_active_sessions.values()):
+            if session_data.get('expires_at') and session_data['expires_at'] > now:
+                yield session_data
+        return
+    
+    docs = (
+        db.collection(ACTIVE_SESSIONS_COLLECTION)
+        .where('expires_at', '>', now)
+        .select(COLLABORATOR_LOOKUP_FIELDS)
+        .stream()
+    )
+    async for doc in docs:
+        yield doc.to_dict()
+
 
 async def register_active_user(user_id: str, github_username: str, github_access_token: str, 
                                 installation_id: Optional[str] = None):
     """Register a user as active in Firestore."""
     key = github_username.lower()
+    now = datetime.now(timezone.utc)
     
     session_data = {
         'user_id': user_id,
         'github_username': github_username,
         'github_access_token': github_access_token,
         'installation_id': installation_id,
-        'logged_in_at': datetime.now().isoformat(),
-        'expires_at': (datetime.now() + timedelta(days=7)).isoformat(),
-        'updated_at': datetime.now().isoformat()
+        'logged_in_at': now,
+        # Stored as a native datetime (Firestore Timestamp) so readers never parse strings
+        'expires_at': now + timedelta(days=7),
+        'updated_at': now
     }
     
     try:
@@ -69,8 +162,7 @@ async def get_active_user_for_repo(username: str) -> Optional[dict]:
             session_data = doc.to_dict()
             
             # Check if session is expired
-            expires_at = datetime.fromisoformat(session_data['expires_at'])
-            if datetime.now() > expires_at:
+            if datetime.now(timezone.utc) > session_data['expires_at']:
                 print(f"⚠️  Session expired for: {username}")
                 await db.collection(ACTIVE_SESSIONS_COLLECTION).document(key).delete()
                 return None
@@ -84,117 +176,32 @@ async def get_active_user_for_repo(username: str) -> Optional[dict]:
         return None
 
 
-async def find_active_user_with_repo_access(repo_full_name: str) -> Optional[dict]:
-    """
-    Find ANY active user who has access to this repository.
-    
-    This enables team collaboration:
-    - If User A (collaborator) is logged in
-    - And User B (any contributor) pushes code
-    - The webhook triggers using User A's token
-    
-    Args:
-        repo_full_name: Repository full name (owner/repo)
-        
-    Returns:
-        Active user session with repo access, or None
-    """
-    print(f"\n🔍 Searching for active users with access to {repo_full_name}...")
-    
-    try:
-        # Get all active sessions
-        docs = db.collection(ACTIVE_SESSIONS_COLLECTION).stream()
-        
-        active_users = []
-        async for doc in docs:
-            session_data = doc.to_dict()
-            
-            # Check if session is expired
-            try:
-                expires_at = datetime.fromisoformat(session_data['expires_at'])
-                if datetime.now() > expires_at:
-                    continue
-            except Exception:
-                continue
-            
-            active_users.append(session_data)
-        
-        if not active_users:
-            print(f"   No active users logged in")
-            return None
-        
-        print(f"   Found {len(active_users)} active users total")
-        for user in active_users:
-            print(f"     - {user['github_username']}")
-        
-        # Check each active user to see if they have access to this repo
-        from github import Github, GithubException
-        
-        for session in active_users:
-            username = session['github_username']
-            token = session['github_access_token']
-            
-            try:
-                print(f"\n   🔍 Checking {username}'s access to {repo_full_name}...")
-                gh = Github(token)
-                gh_repo = gh.get_repo(repo_full_name)
-                
-                # If we can access the repo, this user has permissions
-                permissions = gh_repo.permissions
-                
-                # Check if user has at least read access (collaborators have pull access)
-                if permissions.pull or permissions.push or permissions.admin:
-                    print(f"   ✓ {username} has access to {repo_full_name}")
-                    print(f"     Permissions: push={permissions.push}, admin={permissions.admin}")
-                    return session
-                else:
-                    print(f"   ✗ {username} has no access to {repo_full_name}")
-                    
-            except GithubException as e:
-                if e.status == 404:
-                    print(f"   ✗ {username} cannot access {repo_full_name} (404)")
-                else:
-                    print(f"   ⚠️  Error checking {username}: {e}")
-                continue
-            except Exception as e:
-                print(f"   ⚠️  Error checking {username}: {e}")
-                continue
-        
-        print(f"\n   ❌ No active user has access to {repo_full_name}")
-        return None
-        
-    except Exception as e:
-        print(f"❌ Error finding active user with repo access: {e}")
-        import traceback
-        traceback.print_exc()
-        return None
-
-
 async def get_all_active_sessions() -> Dict:
     """Get all active sessions from Firestore."""
     try:
-        docs = db.collection(ACTIVE_SESSIONS_COLLECTION).stream()
+        docs = db.collection(ACTIVE_SESSIONS_COLLECTION).select(SESSION_LISTING_FIELDS).stream()
         
         sessions = []
         session_keys = []
         expired_keys = []
+        now = datetime.now(timezone.utc)
         
         async for doc in docs:
             session_data = doc.to_dict()
+            expires_at = session_data.get('expires_at')
             
             try:
-                expires_at = datetime.fromisoformat(session_data['expires_at'])
-                if datetime.now() > expires_at:
+                if now > expires_at:
                     expired_keys.append(doc.id)
                     continue
             except Exception:
                 continue
             
             sessions.append({
-                'github_username': session_data['github_username'],
-                'user_id': session_data['user_id'],
-                'logged_in_at': session_data['logged_in_at'],
-                'expires_at': session_data['expires_at'],
+                'github_username': session_data.get('github_username'),
+                'user_id': session_data.get('user_id'),
+                'logged_in_at': session_data.get('logged_in_at'),
+                'expires_at': expires_at,
                 'has_installation': session_data.get('installation_id') is not None
             })
             session_keys.append(doc.id)
@@ -225,20 +232,37 @@ async def get_all_active_sessions() -> Dict:
         }
 
 
-def verify_webhook_signature(payload_body: bytes, signature_header: str) -> bool:
-    """Verify GitHub webhook HMAC-SHA256 signature."""
-    if not GITHUB_WEBHOOK_SECRET:
+async def read_signed_body(request: Request):
+    """
+    Read the request body, feeding each chunk into the webhook HMAC as it arrives.
+    
+    Hashing overlaps with the network read, so large push payloads never
+    block the event loop on one big HMAC at the end.
+    
+    Returns:
+        (body bytes, running HMAC or None if no secret is configured)
+    """
+    mac = hmac.new(_WEBHOOK_SECRET_BYTES, digestmod=hashlib.sha256) if _WEBHOOK_SECRET_BYTES else None
+    chunks = []
+    
+    async for chunk in request.stream():
+        if mac is not None:
+            mac.update(chunk)
+        chunks.append(chunk)
+    
+    return b"".join(chunks), mac
+
+
+def verify_webhook_signature(mac, signature_header: str) -> bool:
+    """Verify GitHub webhook HMAC-SHA256 signature against a body HMAC."""
+    if mac is None:
         print("⚠️  No webhook secret configured - skipping verification")
         return True
     
     if not signature_header:
         return False
     
-    expected_signature = "sha256=" + hmac.new(
-        GITHUB_WEBHOOK_SECRET.encode('utf-8'),
-        payload_body,
-        hashlib.sha256
-    ).hexdigest()
+    expected_signature = "sha256=" + mac.hexdigest()
     
     return hmac.compare_digest(expected_signature, signature_header)
 
@@ -302,7 +326,7 @@ async def github_webhook(request: Request, background_tasks: BackgroundTasks) ->
     
     Triggers on push if ANY logged-in user (collaborator) has access to the repo.
     """
-    body = await request.body()
+    body, mac = await read_signed_body(request)
     signature = request.headers.get("X-Hub-Signature-256", "")
     event_type = request.headers.get("X-GitHub-Event", "")
     delivery_id = request.headers.get("X-GitHub-Delivery", "")
@@ -310,13 +334,13 @@ async def github_webhook(request: Request, background_tasks: BackgroundTasks) ->
     print(f"\n📨 Webhook received: {event_type} (delivery: {delivery_id})")
     
     # Verify signature
-    if not verify_webhook_signature(body, signature):
+    if not verify_webhook_signature(mac, signature):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid webhook signature"
         )
     
-    payload = json.loads(body)
+    payload = orjson.loads(body)
     
     # Handle ping
     if event_type == "ping":
@@ -383,22 +407,20 @@ async def _handle_push_event(payload: dict, background_tasks: BackgroundTasks) -
     
     # ===== NEW: Find ANY active user with repo access =====
     print(f"\n🔍 Checking for ANY active user with access to {repo_full_name}...")
-    active_user = await find_active_user_with_repo_access(repo_full_name)
+    active_user, active_usernames = await find_active_user_with_repo_access(repo_full_name)
     
     if not active_user:
-        all_sessions = await get_all_active_sessions()
-        
         print(f"\n❌ No active user with repo access found")
         print(f"   Repo: {repo_full_name}")
         print(f"   Pusher: {pusher_name}")
-        print(f"   Active users: {[u['github_username'] for u in all_sessions.get('users', [])]}")
+        print(f"   Active users: {active_usernames}")
         
         return {
             "status": "skipped",
             "repo": repo_full_name,
             "reason": f"No logged-in collaborator with access to {repo_full_name}",
             "pusher": pusher_name,
-            "active_users": [u['github_username'] for u in all_sessions.get('users', [])],
+            "active_users": active_usernames,
             "hint": "Any collaborator can enable webhooks by logging in at /auth/login"
         }
     
@@ -474,7 +496,7 @@ async def _handle_push_event(payload: dict, background_tasks: BackgroundTasks) -
     }
 
 
-async def find_active_user_with_repo_access(repo_full_name: str) -> Optional[dict]:
+async def find_active_user_with_repo_access(repo_full_name: str) -> Tuple[Optional[dict], List[str]]:
     """
     Find ANY active user who has access to this repository.
     
@@ -482,47 +504,27 @@ async def find_active_user_with_repo_access(repo_full_name: str) -> Optional[dic
     This enables team collaboration where any logged-in team member
     can enable webhooks for the whole team.
     
+    The sessions collection is scanned at most once, so the usernames seen
+    along the way are returned too (complete whenever no match is found).
+    
     Args:
         repo_full_name: Repository full name (owner/repo)
         
     Returns:
-        Active user session with repo access, or None
+        (active user session with repo access or None, active usernames checked)
     """
     print(f"🔍 Searching for active users with access to {repo_full_name}...")
     
     try:
-        # Get all active sessions from Firestore
-        docs = db.collection(ACTIVE_SESSIONS_COLLECTION).stream()
-        
-        active_users = []
-        async for doc in docs:
-            session_data = doc.to_dict()
-            
-            # Check if session is expired
-            try:
-                expires_at = datetime.fromisoformat(session_data['expires_at'])
-                if datetime.now() > expires_at:
-                    # Skip expired session
-                    continue
-            except Exception:
-                continue
-            
-            active_users.append(session_data)
-        
-        if not active_users:
-            print(f"   No active users logged in")
-            return None
-        
-        print(f"   Found {len(active_users)} active users:")
-        for user in active_users:
-            print(f"     - {user['github_username']}")
-        
-        # Check each active user to see if they have access to this repo
         from github import Github, GithubException
         
-        for session in active_users:
+        # Sessions are consumed lazily so we stop as soon as one
+        # collaborator has access.
+        active_usernames = []
+        async for session in _iter_active_sessions():
             username = session['github_username']
             token = session['github_access_token']
+            active_usernames.append(username)
             
             try:
                 print(f"\n   🔍 Checking if {username} has access to {repo_full_name}...")
@@ -538,7 +540,7 @@ async def find_active_user_with_repo_access(repo_full_name: str) -> Optional[dic
                 if permissions.pull or permissions.push or permissions.admin:
                     print(f"   ✓ {username} has access!")
                     print(f"     Permissions: pull={permissions.pull}, push={permissions.push}, admin={permissions.admin}")
-                    return session
+                    return session, active_usernames
                 else:
                     print(f"   ✗ {username} has no access permissions")
                     
@@ -550,14 +552,18 @@ async def find_active_user_with_repo_access(repo_full_name: str) -> Optional[dic
             except Exception as e:
                 print(f"   ⚠️  Error checking {username}: {e}")
         
-        print(f"\n   ❌ None of the {len(active_users)} active users have access to {repo_full_name}")
-        return None
+        if not active_usernames:
+            print(f"   No active users logged in")
+            return None, active_usernames
+        
+        print(f"\n   ❌ None of the {len(active_usernames)} active users have access to {repo_full_name}")
+        return None, active_usernames
         
     except Exception as e:
         print(f"❌ Error finding active user with repo access: {e}")
         import traceback
         traceback.print_exc()
-        return None
+        return None, []
 
 
 # ==================== SESSION MANAGEMENT ENDPOINTS ====================
@@ -3,7 +3,7 @@ from app.models import User, UserCreate, UserUpdate
 from app.models import Workspace, WorkspaceId
 from app.models import UserId, InstallationId
 from fastapi import HTTPException, status
-from datetime import datetime
+from datetime import datetime, timezone
 
 
 async def get_user_by_id(user_id: UserId) -> User:
@@ -32,8 +32,9 @@ async def create_user(user_data: UserCreate) -> User:
   user_ref = db.collection("users").document(str(user_data.id))
   user_dict = user_data.model_dump()
   user_dict["workspace_ids"] = []
-  user_dict["created_at"] = datetime.now()
-  user_dict["updated_at"] = datetime.now()
+  now = datetime.now(timezone.utc)
+  user_dict["created_at"] = now
+  user_dict["updated_at"] = now
 
   await user_ref.set(user_dict)
   return user_dict
@@ -47,8 +48,8 @@ async def update_user(user_id: UserId, update_data:UserUpdate) -> None:
   """
   user_ref = db.collection("users").document(str(user_id))
 
-  update_dict = {k: v for k, v in update_data.model_dump().items() if v is not None}
-  update_dict["updated_at"] = datetime.now()
+  update_dict = update_data.model_dump(exclude_none=True)
+  update_dict["updated_at"] = datetime.now(timezone.utc)
 
   await user_ref.update(update_dict)
 
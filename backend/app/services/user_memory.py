@@ -3,52 +3,86 @@ In-memory user store - bypasses Firestore for testing
 """
 from app.models import User, UserCreate, UserUpdate
 from app.types import UserId
-from datetime import datetime
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from typing import Optional
+import logging
+import sys
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(slots=True)
+class _UserRecord:
+    """Slotted per-user record; fields mirror the User model."""
+    id: UserId
+    github_username: str
+    email: Optional[str]
+    avatar_url: str
+    github_access_token: str
+    github_refresh_token: Optional[str]
+    installation_id: Optional[int] = None
+    workspace_ids: list = field(default_factory=list)
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+    def to_dict(self) -> dict:
+        """Legacy dict shape returned to callers."""
+        return asdict(self)
+
+
+# Keys are always interned str so lookups stay on CPython's str-only dict path
+_users: dict[str, _UserRecord] = {}
+
+
+def _user_key(user_id: UserId) -> str:
+    """Interned store key for a user id."""
+    return sys.intern(str(user_id))
 
-_users = {}
 
 async def get_user_by_id(user_id: UserId) -> User:
-    user = _users.get(str(user_id))
-    print(f"  ✓ get_user: {'Found' if user else 'Not found'}")
-    return user
+    user = _users.get(_user_key(user_id))
+    logger.debug("get_user: %s", "Found" if user else "Not found")
+    return user.to_dict() if user else None
 
 
 async def create_user(user_data: UserCreate) -> User:
-    user_dict = user_data.model_dump()
-    user_dict["workspace_ids"] = []
-    user_dict["created_at"] = datetime.now()
-    user_dict["updated_at"] = datetime.now()
+    now = datetime.now(timezone.utc)
+    user = _UserRecord(**user_data.model_dump(), created_at=now, updated_at=now)
     
-    _users[str(user_data.id)] = user_dict
-    print(f"  ✓ Created user (memory): {user_data.github_username}")
-    return user_dict
+    _users[_user_key(user_data.id)] = user
+    logger.debug("Created user (memory): %s", user_data.github_username)
+    return user.to_dict()
 
 
 async def update_user(user_id: UserId, update_data: UserUpdate) -> None:
-    if str(user_id) in _users:
-        update_dict = {k: v for k, v in update_data.model_dump().items() if v is not None}
-        update_dict["updated_at"] = datetime.now()
-        _users[str(user_id)].update(update_dict)
-        print(f"  ✓ Updated user (memory)")
+    user = _users.get(_user_key(user_id))
+    if user is not None:
+        update_dict = update_data.model_dump(exclude_none=True)
+        update_dict["updated_at"] = datetime.now(timezone.utc)
+        for key, value in update_dict.items():
+            setattr(user, key, value)
+        logger.debug("Updated user (memory): %s", user_id)
 
 
 async def get_user_installation_id(user_id: UserId):
-    user = _users.get(str(user_id))
-    return user.get("installation_id") if user else None
+    user = _users.get(_user_key(user_id))
+    return user.installation_id if user else None
 
 
 async def get_user_workspaces(user_id: UserId):
-    user = _users.get(str(user_id))
-    return user.get("workspace_ids", []) if user else []
+    user = _users.get(_user_key(user_id))
+    return user.workspace_ids if user else []
 
 
 async def add_workspace_to_user(user_id: UserId, workspace_id):
-    if str(user_id) in _users:
-        _users[str(user_id)].setdefault("workspace_ids", []).append(workspace_id)
+    user = _users.get(_user_key(user_id))
+    if user is not None:
+        user.workspace_ids.append(workspace_id)
 
 
 async def remove_workspace_from_user(user_id: UserId, workspace_id):
-    if str(user_id) in _users:
-        workspace_ids = _users[str(user_id)].get("workspace_ids", [])
-        if workspace_id in workspace_ids:
-            workspace_ids.remove(workspace_id)
\ No newline at end of file
+    user = _users.get(_user_key(user_id))
+    if user is not None:
+        if workspace_id in user.workspace_ids:
+            user.workspace_ids.remove(workspace_id)
\ No newline at end of file
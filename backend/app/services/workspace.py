@@ -1,14 +1,31 @@
 from app.clients.firebase import db
 from app.models import WorkspaceId, WorkspaceCreate, Workspace
 from fastapi import HTTPException, status
-from datetime import datetime
+from datetime import datetime, timezone
 import secrets
 import string
 
+JOIN_CODE_ALPHABET = string.ascii_uppercase + string.digits
+# Largest multiple of the alphabet size that fits in a byte; higher bytes are
+# rejected so every character stays uniformly likely.
+_JOIN_CODE_BYTE_LIMIT = 256 - 256 % len(JOIN_CODE_ALPHABET)
+# bytes.translate table mapping each random byte straight to its alphabet
+# character, plus the set of rejected bytes it deletes in the same C pass.
+_JOIN_CODE_TABLE = bytes(
+  JOIN_CODE_ALPHABET.encode("ascii")[byte % len(JOIN_CODE_ALPHABET)] for byte in range(256)
+)
+_JOIN_CODE_REJECTED = bytes(range(_JOIN_CODE_BYTE_LIMIT, 256))
+
 def generate_join_code(length: int = 8) -> str:
-  """Generate a unique join code for a workspace."""
-  alphabet = string.ascii_uppercase + string.digits
-  return ''.join(secrets.choice(alphabet) for _ in range(length))
+  """Generate a unique join code for a workspace.
+
+  Draws one batch of random bytes per attempt and maps it to the alphabet
+  with a single bytes.translate call.
+  """
+  code = b""
+  while len(code) < length:
+    code += secrets.token_bytes(length * 2).translate(_JOIN_CODE_TABLE, _JOIN_CODE_REJECTED)
+  return code[:length].decode("ascii")
 
 async def create_workspace(workspace_data: WorkspaceCreate) -> Workspace:
   """Create a new workspace in firestore.
@@ -21,8 +38,9 @@ async def create_workspace(workspace_data: WorkspaceCreate) -> Workspace:
   """
   workspace_ref = db.collection("workspaces").document(str(workspace_data.id))
   workspace_dict = workspace_data.model_dump()
-  workspace_dict["created_at"] = datetime.now()
-  workspace_dict["updated_at"] = datetime.now()
+  now = datetime.now(timezone.utc)
+  workspace_dict["created_at"] = now
+  workspace_dict["updated_at"] = now
 
   await workspace_ref.set(workspace_dict)
   return workspace_dict
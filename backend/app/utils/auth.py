@@ -1,15 +1,93 @@
 # Comments are generated by Claude
 from app.config import JWT_SECRET_KEY
+import base64
+import hashlib
+import hmac
 import jwt
+import orjson
+import threading
 import time
 from app.models import SessionPayload, JWT, UserId
 
+# HS256 session tokens are signed and verified directly with hashlib/hmac and
+# orjson; PyJWT is only used for its exception types (and RS256 elsewhere).
+_SECRET_BYTES = JWT_SECRET_KEY.encode("utf-8") if JWT_SECRET_KEY else None
+
+# Keyed HMAC-SHA256 state with the ipad/opad blocks already absorbed; each
+# signature copies it instead of re-deriving the key schedule. hashlib's
+# OpenSSL backend uses SHA-NI automatically on CPUs that support it.
+_HMAC_TEMPLATE = hmac.new(_SECRET_BYTES, digestmod=hashlib.sha256) if _SECRET_BYTES else None
+
+# Verified session tokens, kept until their own `exp` passes.
+# Only successfully decoded tokens are stored; invalid ones always re-verify.
+_TOKEN_CACHE_MAX_SIZE = 10_000
+_token_cache: dict[JWT, SessionPayload] = {}
+_token_cache_lock = threading.Lock()
+
+def _b64url_encode(data: bytes) -> bytes:
+  """Base64url-encode without padding, as required by RFC 7515."""
+  return base64.urlsafe_b64encode(data).rstrip(b"=")
+
+def _b64url_decode(segment: bytes) -> bytes:
+  """Decode an unpadded base64url segment."""
+  return base64.urlsafe_b64decode(segment + b"=" * (-len(segment) % 4))
+
+_HEADER_SEGMENT = _b64url_encode(orjson.dumps({"alg": "HS256", "typ": "JWT"}))
+
+def _sign(signing_input: bytes) -> bytes:
+  """Compute the raw HS256 signature for a JWT signing input."""
+  if _HMAC_TEMPLATE is None:
+    raise RuntimeError("JWT_SECRET_KEY is not configured")
+  mac = _HMAC_TEMPLATE.copy()
+  mac.update(signing_input)
+  return mac.digest()
+
+def _encode_hs256(payload: SessionPayload) -> JWT:
+  """Encode and sign a payload as a compact HS256 JWT."""
+  signing_input = _HEADER_SEGMENT + b"." + _b64url_encode(orjson.dumps(payload))
+  return (signing_input + b"." + _b64url_encode(_sign(signing_input))).decode("ascii")
+
+def _decode_hs256(token: JWT) -> SessionPayload:
+  """Verify an HS256 JWT and return its payload.
+
+    Raises:
+        jwt.ExpiredSignatureError: If the token has expired.
+        jwt.InvalidTokenError: If the token is malformed or signature is invalid.
+    """
+  try:
+    signing_input, _, signature_segment = token.encode("ascii").rpartition(b".")
+    header_segment, _, payload_segment = signing_input.partition(b".")
+    if not header_segment or not payload_segment or b"." in payload_segment:
+      raise jwt.DecodeError("Not enough segments")
+    if header_segment != _HEADER_SEGMENT:
+      header = orjson.loads(_b64url_decode(header_segment))
+      if header.get("alg") != "HS256":
+        raise jwt.InvalidAlgorithmError("The specified alg value is not allowed")
+    signature = _b64url_decode(signature_segment)
+  except jwt.InvalidTokenError:
+    raise
+  except Exception as e:
+    raise jwt.DecodeError(f"Invalid token: {e}") from e
+
+  if not hmac.compare_digest(_sign(signing_input), signature):
+    raise jwt.InvalidSignatureError("Signature verification failed")
+
+  try:
+    payload: SessionPayload = orjson.loads(_b64url_decode(payload_segment))
+    exp = int(payload["exp"])
+  except Exception as e:
+    raise jwt.DecodeError(f"Invalid payload: {e}") from e
+
+  if exp <= time.time():
+    raise jwt.ExpiredSignatureError("Signature has expired")
+  return payload
+
 def generate_session_token(user_id: UserId) -> JWT:
   """Generate a JWT token for user sessions.
-    
+
     Args:
         user_id: The unique identifier for the user to encode in the token.
-        
+
     Returns:
         A signed JWT token string valid for 7 days.
     """
@@ -18,21 +96,48 @@ def generate_session_token(user_id: UserId) -> JWT:
     "exp": int(time.time() + 60 * 60 * 24 * 7),  # 7 days from current time
     "sub": user_id
   }
-  token: JWT = jwt.encode(payload, JWT_SECRET_KEY, algorithm="HS256")
+  token: JWT = _encode_hs256(payload)
   return token
 
+def _cache_session_payload(token: JWT, payload: SessionPayload, now: float) -> None:
+  """Store a verified payload, evicting expired (then oldest) entries when full.
+
+    Args:
+        token: The raw JWT string used as the cache key.
+        payload: The verified payload to cache.
+        now: The current time, used to find expired entries.
+    """
+  with _token_cache_lock:
+    if len(_token_cache) >= _TOKEN_CACHE_MAX_SIZE:
+      for key in [k for k, v in _token_cache.items() if v["exp"] <= now]:
+        del _token_cache[key]
+      while len(_token_cache) >= _TOKEN_CACHE_MAX_SIZE:
+        del _token_cache[next(iter(_token_cache))]
+    _token_cache[token] = payload
+
 def validate_session_token(token: JWT) -> SessionPayload:
   """Validate and decode a JWT session token.
-    
+
+    Tokens that verified successfully are cached until they expire, so
+    repeated requests with the same session skip HS256 verification.
+
     Args:
         token: The JWT token string to validate.
-        
+
     Returns:
         The decoded payload containing iat, exp, and sub (user ID).
-        
+
     Raises:
         jwt.ExpiredSignatureError: If the token has expired.
         jwt.InvalidTokenError: If the token is malformed or signature is invalid.
     """
-  decoded_payload: SessionPayload = jwt.decode(token, key=JWT_SECRET_KEY, algorithms=["HS256"])
-  return decoded_payload
\ No newline at end of file
+  now = time.time()
+  cached = _token_cache.get(token)
+  if cached is not None:
+    if cached["exp"] > now:
+      return cached
+    _token_cache.pop(token, None)
+
+  decoded_payload: SessionPayload = _decode_hs256(token)
+  _cache_session_payload(token, decoded_payload, now)
+  return decoded_payload
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+One-off migration: convert ISO-string `expires_at` fields in the active
+webhook sessions collection to native Firestore Timestamps.
+
+Run from the backend directory:
+    python scripts/migrate_session_expiry.py [--dry-run]
+"""
+import os
+import sys
+import asyncio
+import argparse
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app.clients.firebase import db
+from app.routes.webhook import ACTIVE_SESSIONS_COLLECTION
+
+
+async def migrate(dry_run: bool = False) -> int:
+    converted = 0
+    
+    async for doc in db.collection(ACTIVE_SESSIONS_COLLECTION).stream():
+        expires_at = doc.to_dict().get('expires_at')
+        if not isinstance(expires_at, str):
+            continue
+        
+        try:
+            parsed = datetime.fromisoformat(expires_at)
+        except ValueError:
+            print(f"⚠️  Skipping {doc.id}: unparseable expires_at {expires_at!r}")
+            continue
+        
+        # Legacy values were written with naive datetime.now(); treat them as UTC
+        if parsed.tzinfo is None:
+            parsed = parsed.replace(tzinfo=timezone.utc)
+        
+        print(f"   {doc.id}: {expires_at} → {parsed.isoformat()}")
+        if not dry_run:
+            await db.collection(ACTIVE_SESSIONS_COLLECTION).document(doc.id).update({'expires_at': parsed})
+        converted += 1
+    
+    return converted
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Convert session expires_at strings to Firestore Timestamps')
+    parser.add_argument('--dry-run', action='store_true', help='Report changes without writing them')
+    
+    args = parser.parse_args()
+    
+    converted = asyncio.run(migrate(args.dry_run))
+    action = "Would convert" if args.dry_run else "Converted"
+    print(f"\n✅ {action} {converted} session(s) in {ACTIVE_SESSIONS_COLLECTION}")
+
+
+if __name__ == '__main__':
+    main()
@@ -3,6 +3,8 @@ Ingest Service API
 Exposes the RAG pipeline (ingest, chunk, embed) as HTTP endpoints.
 Called by the backend service.
 """
+import os
+
 from fastapi import FastAPI
 from app.routes.pipeline import router as pipeline_router
 
@@ -17,4 +19,19 @@ app.include_router(pipeline_router)
 
 @app.get("/health")
 async def health():
-    return {"status": "healthy", "service": "ingest-service"}
\ No newline at end of file
+    return {"status": "healthy", "service": "ingest-service"}
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    # uvloop + httptools ship with uvicorn[standard]. One web worker by
+    # default: each worker runs its own chunking process pool (pipeline.py)
+    uvicorn.run(
+        "app.main:app",
+        host=os.getenv("HOST", "0.0.0.0"),
+        port=int(os.getenv("PORT", "8080")),
+        loop="uvloop",
+        http="httptools",
+        workers=int(os.getenv("WEB_CONCURRENCY", "1"))
+    )
\ No newline at end of file
@@ -10,14 +10,20 @@ from typing import Optional, Dict, List
 import os
 import json
 import asyncio
+import functools
+import hashlib
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 
 from src.ingestion.github_ingester import GitHubIngester
-from src.chunking.enhanced_chunker import EnhancedCodeChunker
 from src.chunking.embedder import ChunkEmbedder
+from src.chunking.workers import chunk_repository_worker
 from src.rag.rag_services import RAGServices
+from src.rag.llm_client_gemini_api import GeminiClient
 from src.rag.vector_search import VectorSearch
 from src.github.github_client import GitHubClient
-from src.utils.storage_utils import get_shared_repo_path
+from src.utils.storage_utils import create_storage_client, get_shared_repo_path, iter_jsonl_blob
 from src.utils.commit_tracker import CommitTracker
 
 router = APIRouter(prefix="/pipeline", tags=["Pipeline"])
@@ -26,9 +32,70 @@ router = APIRouter(prefix="/pipeline", tags=["Pipeline"])
 PROJECT_ID = os.getenv("GCP_PROJECT_ID", "otto-pm")
 BUCKET_RAW = os.getenv("GCS_BUCKET_RAW", "otto-pm-raw-repos")
 BUCKET_PROCESSED = os.getenv("GCS_BUCKET_PROCESSED", "otto-pm-processed-chunks")
+VERBOSE = os.getenv("VERBOSE", "false").lower() == "true"
 
 # Initialize shared components
-commit_tracker = CommitTracker(PROJECT_ID, BUCKET_PROCESSED)
+# One storage client (and bucket handles) per process: construction does
+# credential discovery and connection-pool setup
+_STORAGE_CLIENT = create_storage_client(PROJECT_ID)
+_RAW_BUCKET = _STORAGE_CLIENT.bucket(BUCKET_RAW)
+_PROCESSED_BUCKET = _STORAGE_CLIENT.bucket(BUCKET_PROCESSED)
+
+# Commit lookups are cached briefly so webhook bursts don't refetch from GCS
+COMMIT_CACHE_TTL = float(os.getenv("COMMIT_CACHE_TTL", "30"))
+commit_tracker = CommitTracker(PROJECT_ID, BUCKET_PROCESSED, cache_ttl=COMMIT_CACHE_TTL,
+                               storage_client=_STORAGE_CLIENT)
+
+
+# Chunking is CPU-bound (tree-sitter + regex extraction), so it runs in a
+# process pool; spawn avoids forking a server process that holds threads.
+# Every web worker owns a pool, so the CPUs are split between them.
+WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", "1"))
+CHUNK_WORKERS = int(os.getenv("CHUNK_WORKERS",
+                              max(1, (os.cpu_count() or 1) // max(1, WEB_CONCURRENCY))))
+_CPU_POOL = ProcessPoolExecutor(max_workers=CHUNK_WORKERS,
+                                mp_context=multiprocessing.get_context("spawn"))
+
+
+# Authenticated GitHub clients, keyed by a digest of the user token so raw
+# tokens are not kept as cache keys; least recently used entries are dropped
+GITHUB_CLIENT_CACHE_SIZE = 256
+_github_clients: Dict[str, GitHubClient] = {}
+_github_clients_lock = threading.Lock()
+
+
+def _get_github_client(github_token: str) -> GitHubClient:
+    """Reuse one authenticated GitHub client per user token."""
+    key = hashlib.sha256(github_token.encode('utf-8')).hexdigest()
+    
+    with _github_clients_lock:
+        client = _github_clients.pop(key, None)
+        if client is None:
+            client = GitHubClient(github_token)
+            while len(_github_clients) >= GITHUB_CLIENT_CACHE_SIZE:
+                del _github_clients[next(iter(_github_clients))]
+        _github_clients[key] = client
+    return client
+
+
+@functools.lru_cache(maxsize=1)
+def _get_vector_search() -> VectorSearch:
+    """Shared vector search, backed by the process-wide storage client."""
+    return VectorSearch(PROJECT_ID, BUCKET_PROCESSED, storage_client=_STORAGE_CLIENT)
+
+
+@functools.lru_cache(maxsize=1)
+def _get_llm() -> GeminiClient:
+    """Shared Gemini client; built on first use so a missing API key only fails RAG routes."""
+    return GeminiClient(PROJECT_ID)
+
+
+def _get_rag_services(github_token: str) -> RAGServices:
+    """Per-request RAG services (they carry the caller's GitHub client) over shared sub-clients."""
+    rag = RAGServices(PROJECT_ID, BUCKET_PROCESSED, enable_github=True, enable_local_save=False,
+                      llm=_get_llm(), search=_get_vector_search())
+    rag.github_client = _get_github_client(github_token)
+    return rag
 
 
 # ==================== REQUEST/RESPONSE MODELS ====================
@@ -187,6 +254,114 @@ class RepoStatusResponse(BaseModel):
     commit_info: Optional[Dict] = None
 
 
+# ==================== PIPELINE STEPS ====================
+# Plain helpers shared by the step endpoints and run_full_pipeline, so the
+# full pipeline reuses one GitHub/storage client instead of re-entering
+# the HTTP handlers.
+
+def _resolve_branch_head(gh, repo_full_name: str, branch: Optional[str]) -> Dict:
+    """Look up the branch and its head commit details (blocking PyGithub calls)."""
+    gh_repo = gh.get_repo(repo_full_name)
+    branch = branch or gh_repo.default_branch
+    commit = gh_repo.get_branch(branch).commit
+
+    return {
+        'branch': branch,
+        'sha': commit.sha,
+        'author': commit.author.login if commit.author else "unknown",
+        'message': commit.commit.message.split('\n')[0] if commit.commit else None
+    }
+
+
+def _embed_stats(chunks, stop_at_missing: bool = False) -> tuple:
+    """
+    Count chunks and embedded chunks in a single pass
+    
+    Args:
+        chunks: Iterable of chunk dicts (a list or a streaming JSONL iterator)
+        stop_at_missing: Stop at the first chunk without an embedding; the
+            counts are then partial but the fully-embedded flag is exact
+        
+    Returns:
+        (total, embedded, fully_embedded) where fully_embedded requires at
+        least one chunk
+    """
+    total = 0
+    embedded = 0
+    for chunk in chunks:
+        total += 1
+        if chunk.get('embedding'):
+            embedded += 1
+        elif stop_at_missing:
+            return total, embedded, False
+    return total, embedded, total > 0 and total == embedded
+
+
+async def _do_ingest(repo_full_name: str, branch: Optional[str], github_token: str,
+                     gh, storage_client) -> Dict:
+    """Ingest a repository into GCS unless the tracked commit is current."""
+    # PyGithub is synchronous; keep its HTTP round-trips off the event loop
+    head = await asyncio.to_thread(_resolve_branch_head, gh, repo_full_name, branch)
+    branch = head['branch']
+    current_sha = head['sha']
+
+    # Commit tracking reads/writes GCS synchronously; keep it off the loop too
+    needs_update, reason = await asyncio.to_thread(
+        commit_tracker.needs_update, repo_full_name, current_sha
+    )
+
+    if not needs_update:
+        return {
+            'total_files': 0,
+            'commit_sha': current_sha[:8],
+            'message': f"Already up to date. {reason}",
+            'was_cached': True
+        }
+
+    # Run ingestion
+    ingester = GitHubIngester(PROJECT_ID, BUCKET_RAW, github_token,
+                              storage_client=storage_client)
+    metadata = await asyncio.to_thread(ingester.ingest_repository, repo_full_name, branch)
+
+    # Save commit info
+    await asyncio.to_thread(
+        commit_tracker.save_commit_info,
+        repo_full_name,
+        current_sha,
+        branch,
+        head['author'],
+        head['message']
+    )
+
+    return {
+        'total_files': metadata['total_files'],
+        'commit_sha': current_sha[:8],
+        'message': f"Ingested {metadata['total_files']} files. {reason}",
+        'was_cached': False
+    }
+
+
+async def _do_chunk(repo_full_name: str, chunk_size: int, overlap: int) -> int:
+    """Chunk an ingested repository in the process pool and return the number of chunks."""
+    repo_path = get_shared_repo_path(repo_full_name)
+
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        _CPU_POOL, chunk_repository_worker,
+        PROJECT_ID, BUCKET_RAW, BUCKET_PROCESSED, repo_path, chunk_size, overlap
+    )
+
+
+async def _do_embed(repo_full_name: str, force_reembed: bool, storage_client) -> int:
+    """Embed a chunked repository and return the number of newly embedded chunks."""
+    repo_path = get_shared_repo_path(repo_full_name)
+
+    # Embedding mostly waits on Vertex AI, so a thread is enough to free the loop
+    embedder = ChunkEmbedder(PROJECT_ID, BUCKET_PROCESSED, storage_client=storage_client)
+    stats = await asyncio.to_thread(embedder.embed_repository, repo_path, force_reembed)
+    return stats.get('newly_embedded', 0)
+
+
 # ==================== PIPELINE ENDPOINTS ====================
 
 @router.post("/ingest", response_model=IngestResponse)
@@ -196,51 +371,11 @@ async def ingest_repository(request: IngestRequest):
     Checks commit tracker for smart caching.
     """
     try:
-        repo_path = get_shared_repo_path(request.repo_full_name)
-
-        # Check if update needed
-        from github import Github
-        gh = Github(request.github_token)
-        gh_repo = gh.get_repo(request.repo_full_name)
-        branch = request.branch or gh_repo.default_branch
-        current_sha = gh_repo.get_branch(branch).commit.sha
-
-        needs_update, reason = commit_tracker.needs_update(
-            request.repo_full_name, current_sha
-        )
-
-        if not needs_update:
-            return IngestResponse(
-                success=True,
-                repo=request.repo_full_name,
-                total_files=0,
-                commit_sha=current_sha[:8],
-                message=f"Already up to date. {reason}",
-                was_cached=True
-            )
-
-        # Run ingestion
-        ingester = GitHubIngester(PROJECT_ID, BUCKET_RAW, request.github_token)
-        metadata = ingester.ingest_repository(request.repo_full_name, request.branch)
-
-        # Save commit info
-        commit = gh_repo.get_branch(branch).commit
-        commit_tracker.save_commit_info(
-            request.repo_full_name,
-            current_sha,
-            branch,
-            commit.author.login if commit.author else "unknown",
-            commit.commit.message.split('\n')[0] if commit.commit else None
-        )
-
-        return IngestResponse(
-            success=True,
-            repo=request.repo_full_name,
-            total_files=metadata['total_files'],
-            commit_sha=current_sha[:8],
-            message=f"Ingested {metadata['total_files']} files. {reason}",
-            was_cached=False
+        result = await _do_ingest(
+            request.repo_full_name, request.branch, request.github_token,
+            _get_github_client(request.github_token).github, _STORAGE_CLIENT
         )
+        return IngestResponse(success=True, repo=request.repo_full_name, **result)
 
     except Exception as e:
         raise HTTPException(
@@ -253,19 +388,15 @@ async def ingest_repository(request: IngestRequest):
 async def chunk_repository(request: ChunkRequest):
     """Step 2: Chunk ingested repository code into semantic pieces."""
     try:
-        repo_path = get_shared_repo_path(request.repo_full_name)
-
-        chunker = EnhancedCodeChunker(PROJECT_ID, BUCKET_RAW, BUCKET_PROCESSED)
-        chunker.chunk_size = request.chunk_size
-        chunker.overlap_lines = request.overlap
-
-        chunks = chunker.process_repository(repo_path)
+        total_chunks = await _do_chunk(
+            request.repo_full_name, request.chunk_size, request.overlap
+        )
 
         return ChunkResponse(
             success=True,
             repo=request.repo_full_name,
-            total_chunks=len(chunks),
-            message=f"Created {len(chunks)} chunks"
+            total_chunks=total_chunks,
+            message=f"Created {total_chunks} chunks"
         )
 
     except Exception as e:
@@ -279,16 +410,13 @@ async def chunk_repository(request: ChunkRequest):
 async def embed_repository(request: EmbedRequest):
     """Step 3: Generate embeddings for chunked code."""
     try:
-        repo_path = get_shared_repo_path(request.repo_full_name)
-
-        embedder = ChunkEmbedder(PROJECT_ID, BUCKET_PROCESSED)
-        stats = embedder.embed_repository(repo_path, request.force_reembed)
+        total_embedded = await _do_embed(request.repo_full_name, request.force_reembed, _STORAGE_CLIENT)
 
         return EmbedResponse(
             success=True,
             repo=request.repo_full_name,
-            total_embedded=stats.get('newly_embedded', 0),
-            message=f"Embedded {stats.get('newly_embedded', 0)} chunks"
+            total_embedded=total_embedded,
+            message=f"Embedded {total_embedded} chunks"
         )
 
     except Exception as e:
@@ -308,72 +436,90 @@ async def run_full_pipeline(request: FullPipelineRequest):
     - Webhook handler on push events
     """
     try:
-        print(f"\n{'='*60}")
-        print(f"🚀 FULL PIPELINE: {request.repo_full_name}")
-        print(f"{'='*60}")
+        if VERBOSE:
+            print(f"\n{'='*60}")
+            print(f"🚀 FULL PIPELINE: {request.repo_full_name}")
+            print(f"{'='*60}")
+
+        # Shared clients for every step of this run
+        gh = _get_github_client(request.github_token).github
+        client = _STORAGE_CLIENT
 
         # ---- Step 1: Ingest ----
-        print(f"\n📥 Step 1/3: Ingesting...")
-        ingest_result = await ingest_repository(IngestRequest(
-            repo_full_name=request.repo_full_name,
-            branch=request.branch,
-            github_token=request.github_token
-        ))
-
-        if ingest_result.was_cached:
+        if VERBOSE:
+            print(f"\n📥 Step 1/3: Ingesting...")
+        try:
+            ingest_result = await _do_ingest(
+                request.repo_full_name, request.branch, request.github_token, gh, client
+            )
+        except Exception as e:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Ingestion failed: {str(e)}"
+            )
+
+        if ingest_result['was_cached']:
             # Check if chunks and embeddings already exist
             repo_path = get_shared_repo_path(request.repo_full_name)
-            from google.cloud import storage
-            client = storage.Client(project=PROJECT_ID)
-            bucket = client.bucket(BUCKET_PROCESSED)
-            chunks_blob = bucket.blob(f"{repo_path}/chunks.jsonl")
+            chunks_blob = _PROCESSED_BUCKET.blob(f"{repo_path}/chunks.jsonl")
 
             if chunks_blob.exists():
-                content = chunks_blob.download_as_text()
-                chunks = [json.loads(line) for line in content.split('\n') if line.strip()]
-                has_embeddings = all(c.get('embedding') for c in chunks) if chunks else False
+                # Stream the chunks and stop at the first one without an embedding
+                total_chunks, _, has_embeddings = _embed_stats(
+                    iter_jsonl_blob(chunks_blob), stop_at_missing=True
+                )
 
                 if has_embeddings:
                     return FullPipelineResponse(
                         success=True,
                         repo=request.repo_full_name,
                         total_files=0,
-                        total_chunks=len(chunks),
-                        total_embedded=len(chunks),
-                        commit_sha=ingest_result.commit_sha,
+                        total_chunks=total_chunks,
+                        total_embedded=total_chunks,
+                        commit_sha=ingest_result['commit_sha'],
                         was_cached=True,
                         message="Repository already fully indexed and up to date"
                     )
 
         # ---- Step 2: Chunk ----
-        print(f"\n🔪 Step 2/3: Chunking...")
-        chunk_result = await chunk_repository(ChunkRequest(
-            repo_full_name=request.repo_full_name,
-            chunk_size=request.chunk_size,
-            overlap=request.overlap
-        ))
+        if VERBOSE:
+            print(f"\n🔪 Step 2/3: Chunking...")
+        try:
+            total_chunks = await _do_chunk(
+                request.repo_full_name, request.chunk_size, request.overlap
+            )
+        except Exception as e:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Chunking failed: {str(e)}"
+            )
 
         # ---- Step 3: Embed ----
-        print(f"\n🧮 Step 3/3: Embedding...")
-        embed_result = await embed_repository(EmbedRequest(
-            repo_full_name=request.repo_full_name,
-            force_reembed=request.force_reembed
-        ))
-
-        print(f"\n{'='*60}")
-        print(f"✅ PIPELINE COMPLETE")
-        print(f"   Files: {ingest_result.total_files}")
-        print(f"   Chunks: {chunk_result.total_chunks}")
-        print(f"   Embedded: {embed_result.total_embedded}")
-        print(f"{'='*60}\n")
+        if VERBOSE:
+            print(f"\n🧮 Step 3/3: Embedding...")
+        try:
+            total_embedded = await _do_embed(request.repo_full_name, request.force_reembed, client)
+        except Exception as e:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Embedding failed: {str(e)}"
+            )
+
+        if VERBOSE:
+            print(f"\n{'='*60}")
+            print(f"✅ PIPELINE COMPLETE")
+            print(f"   Files: {ingest_result['total_files']}")
+            print(f"   Chunks: {total_chunks}")
+            print(f"   Embedded: {total_embedded}")
+            print(f"{'='*60}\n")
 
         return FullPipelineResponse(
             success=True,
             repo=request.repo_full_name,
-            total_files=ingest_result.total_files,
-            total_chunks=chunk_result.total_chunks,
-            total_embedded=embed_result.total_embedded,
-            commit_sha=ingest_result.commit_sha,
+            total_files=ingest_result['total_files'],
+            total_chunks=total_chunks,
+            total_embedded=total_embedded,
+            commit_sha=ingest_result['commit_sha'],
             was_cached=False,
             message="Pipeline complete"
         )
@@ -393,9 +539,7 @@ async def run_full_pipeline(request: FullPipelineRequest):
 async def ask_question(request: AskRequest):
     """Ask a question about the codebase using RAG."""
     try:
-        rag = RAGServices(PROJECT_ID, BUCKET_PROCESSED,
-                         enable_github=True, enable_local_save=False)
-        rag.github_client = GitHubClient(request.github_token)
+        rag = _get_rag_services(request.github_token)
 
         repo_path = get_shared_repo_path(request.repo_full_name)
         result = rag.answer_question(
@@ -418,9 +562,7 @@ async def ask_question(request: AskRequest):
 async def generate_docs(request: GenerateDocsRequest):
     """Generate documentation for a codebase."""
     try:
-        rag = RAGServices(PROJECT_ID, BUCKET_PROCESSED,
-                         enable_github=True, enable_local_save=False)
-        rag.github_client = GitHubClient(request.github_token)
+        rag = _get_rag_services(request.github_token)
 
         repo_path = get_shared_repo_path(request.repo_full_name)
         result = rag.generate_documentation(
@@ -456,9 +598,7 @@ async def complete_code(request: CodeCompleteRequest):
     Otto will automatically detect the most relevant file using semantic search.
     """
     try:
-        rag = RAGServices(PROJECT_ID, BUCKET_PROCESSED,
-                         enable_github=True, enable_local_save=False)
-        rag.github_client = GitHubClient(request.github_token)
+        rag = _get_rag_services(request.github_token)
 
         repo_path = get_shared_repo_path(request.repo_full_name)
         result = rag.complete_code(
@@ -502,9 +642,7 @@ async def complete_code(request: CodeCompleteRequest):
 async def edit_code(request: CodeEditRequest):
     """Edit code based on instructions."""
     try:
-        rag = RAGServices(PROJECT_ID, BUCKET_PROCESSED,
-                         enable_github=True, enable_local_save=False)
-        rag.github_client = GitHubClient(request.github_token)
+        rag = _get_rag_services(request.github_token)
 
         repo_path = get_shared_repo_path(request.repo_full_name)
         result = rag.edit_code(
@@ -544,7 +682,7 @@ async def edit_code(request: CodeEditRequest):
 async def search_code(request: SearchRequest):
     """Search code using vector similarity."""
     try:
-        search = VectorSearch(PROJECT_ID, BUCKET_PROCESSED)
+        search = _get_vector_search()
         repo_path = get_shared_repo_path(request.repo_full_name)
 
         chunks = search.search(
@@ -582,9 +720,7 @@ async def search_code(request: SearchRequest):
 async def ask_question_stream(request: AskRequest):
     """Ask a question with real-time token-by-token SSE streaming."""
     try:
-        rag = RAGServices(PROJECT_ID, BUCKET_PROCESSED,
-                         enable_github=True, enable_local_save=False)
-        rag.github_client = GitHubClient(request.github_token)
+        rag = _get_rag_services(request.github_token)
 
         repo_path = get_shared_repo_path(request.repo_full_name)
 
@@ -624,9 +760,7 @@ async def ask_question_stream(request: AskRequest):
 async def generate_docs_stream(request: GenerateDocsRequest):
     """Generate documentation with real-time token-by-token SSE streaming."""
     try:
-        rag = RAGServices(PROJECT_ID, BUCKET_PROCESSED,
-                         enable_github=True, enable_local_save=False)
-        rag.github_client = GitHubClient(request.github_token)
+        rag = _get_rag_services(request.github_token)
 
         repo_path = get_shared_repo_path(request.repo_full_name)
 
@@ -666,9 +800,7 @@ async def generate_docs_stream(request: GenerateDocsRequest):
 async def edit_code_stream(request: CodeEditRequest):
     """Edit code with real-time token-by-token SSE streaming."""
     try:
-        rag = RAGServices(PROJECT_ID, BUCKET_PROCESSED,
-                         enable_github=True, enable_local_save=False)
-        rag.github_client = GitHubClient(request.github_token)
+        rag = _get_rag_services(request.github_token)
 
         repo_path = get_shared_repo_path(request.repo_full_name)
 
@@ -712,70 +844,70 @@ async def edit_code_stream(request: CodeEditRequest):
 
 # ==================== STATUS ENDPOINTS ====================
 
+def _read_total_files(metadata_blob) -> Optional[int]:
+    """Total ingested files from metadata.json, or None if not ingested."""
+    if not metadata_blob.exists():
+        return None
+    metadata = json.loads(metadata_blob.download_as_text())
+    return metadata.get('total_files', 0)
+
+
+def _count_chunks(chunks_blob) -> Optional[tuple]:
+    """(total, embedded, fully_embedded) from chunks.jsonl, or None if not chunked."""
+    if not chunks_blob.exists():
+        return None
+    return _embed_stats(iter_jsonl_blob(chunks_blob))
+
+
 @router.get("/repos/{owner}/{repo}/status", response_model=RepoStatusResponse)
 async def get_repo_status(owner: str, repo: str):
     """Get pipeline status for a repository."""
-    from google.cloud import storage
-
     repo_full_name = f"{owner}/{repo}"
     repo_path = get_shared_repo_path(repo_full_name)
 
-    status_info = {
-        'repo': repo_full_name,
-        'ingested': False,
-        'chunked': False,
-        'embedded': False,
-        'ready_for_rag': False,
-        'total_files': 0,
-        'total_chunks': 0,
-        'pipeline_progress': 0,
-        'commit_info': None
-    }
-
     try:
-        client = storage.Client(project=PROJECT_ID)
-
-        # Check ingestion
-        raw_bucket = client.bucket(BUCKET_RAW)
-        metadata_blob = raw_bucket.blob(f"{repo_path}/metadata.json")
-
-        if metadata_blob.exists():
-            status_info['ingested'] = True
-            status_info['pipeline_progress'] = 33
-            metadata = json.loads(metadata_blob.download_as_text())
-            status_info['total_files'] = metadata.get('total_files', 0)
-
-        # Check chunks
-        processed_bucket = client.bucket(BUCKET_PROCESSED)
-        chunks_blob = processed_bucket.blob(f"{repo_path}/chunks.jsonl")
-
-        if chunks_blob.exists():
-            status_info['chunked'] = True
-            status_info['pipeline_progress'] = 66
-            content = chunks_blob.download_as_text()
-            chunks = [json.loads(line) for line in content.split('\n') if line.strip()]
-            status_info['total_chunks'] = len(chunks)
-
-            embedded_count = sum(1 for c in chunks if c.get('embedding'))
-            if embedded_count == len(chunks) and len(chunks) > 0:
-                status_info['embedded'] = True
-                status_info['pipeline_progress'] = 100
-                status_info['ready_for_rag'] = True
-
-        # Commit info
-        commit_info = commit_tracker.get_last_commit(repo_full_name)
-        if commit_info:
-            status_info['commit_info'] = {
+        metadata_blob = _RAW_BUCKET.blob(f"{repo_path}/metadata.json")
+        chunks_blob = _PROCESSED_BUCKET.blob(f"{repo_path}/chunks.jsonl")
+
+        # The three GCS lookups are independent; run them concurrently
+        total_files, chunk_counts, commit_info = await asyncio.gather(
+            asyncio.to_thread(_read_total_files, metadata_blob),
+            asyncio.to_thread(_count_chunks, chunks_blob),
+            asyncio.to_thread(commit_tracker.get_last_commit, repo_full_name)
+        )
+
+        ingested = total_files is not None
+        chunked = chunk_counts is not None
+        total_chunks, _, embedded = chunk_counts if chunked else (0, 0, False)
+
+        if embedded:
+            pipeline_progress = 100
+        elif chunked:
+            pipeline_progress = 66
+        elif ingested:
+            pipeline_progress = 33
+        else:
+            pipeline_progress = 0
+
+        return RepoStatusResponse(
+            repo=repo_full_name,
+            ingested=ingested,
+            chunked=chunked,
+            embedded=embedded,
+            ready_for_rag=embedded,
+            total_files=total_files or 0,
+            total_chunks=total_chunks,
+            pipeline_progress=pipeline_progress,
+            commit_info={
                 'sha': commit_info.get('commit_sha', '')[:8],
                 'author': commit_info.get('author'),
                 'message': commit_info.get('commit_message'),
                 'processed_at': commit_info.get('processed_at')
-            }
-
-        return RepoStatusResponse(**status_info)
+            } if commit_info else None
+        )
 
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Status check failed: {str(e)}"
-        )
\ No newline at end of file
+        )
@@ -0,0 +1,57 @@
+# scripts/_stats_kernel.py
+"""
+Fused length-statistics kernel for analyze_chunk_quality
+
+Uses Numba when it is installed (one parallel pass, compiled once and cached
+on disk); otherwise falls back to equivalent NumPy reductions.
+"""
+import numpy as np
+
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+
+def _compute_length_stats_numpy(content_len, enriched_len, num_lines):
+    return (
+        int(content_len.sum()),
+        int(enriched_len.sum()),
+        int(np.count_nonzero(num_lines < 100)),
+        int(np.count_nonzero(enriched_len > 1000)),
+    )
+
+
+if NUMBA_AVAILABLE:
+    @njit(parallel=True, cache=True)
+    def _compute_length_stats_numba(content_len, enriched_len, num_lines):
+        sum_content = 0
+        sum_enriched = 0
+        small = 0
+        self_contained = 0
+        for i in prange(content_len.shape[0]):
+            sum_content += content_len[i]
+            sum_enriched += enriched_len[i]
+            if num_lines[i] < 100:
+                small += 1
+            if enriched_len[i] > 1000:
+                self_contained += 1
+        return sum_content, sum_enriched, small, self_contained
+
+
+def compute_length_stats(content_len, enriched_len, num_lines):
+    """
+    Sum content/enriched lengths and count small and self-contained chunks
+    
+    Args:
+        content_len: int64 array of raw content lengths
+        enriched_len: int64 array of enriched content lengths
+        num_lines: int64 array of chunk line counts
+        
+    Returns:
+        (sum_content, sum_enriched, small_chunks, self_contained_chunks)
+    """
+    if NUMBA_AVAILABLE:
+        return tuple(int(v) for v in _compute_length_stats_numba(content_len, enriched_len, num_lines))
+    return _compute_length_stats_numpy(content_len, enriched_len, num_lines)
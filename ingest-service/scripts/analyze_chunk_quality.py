@@ -4,13 +4,184 @@
 Analyze chunk quality for LLM tasks
 """
 import os
+import re
 import sys
-import json
+import mmap
+from array import array
+import numpy as np
+import orjson
+from collections import Counter
 from google.cloud import storage
+from google.cloud.storage import transfer_manager
 from dotenv import load_dotenv
 
+from _stats_kernel import compute_length_stats
+
 load_dotenv()
 
+# Report separators
+SEP_EQ = '=' * 80
+SEP_DASH = '─' * 80
+
+# Read buffer for streaming chunks.jsonl from GCS
+GCS_READ_CHUNK_SIZE = 8 * 1024 * 1024
+
+# Files at least this large are fetched with concurrent ranged reads instead
+# of a single stream
+PARALLEL_DOWNLOAD_THRESHOLD = 256 * 1024 * 1024
+PARALLEL_DOWNLOAD_CHUNK_SIZE = 32 * 1024 * 1024
+PARALLEL_DOWNLOAD_WORKERS = 8
+
+# Downloaded chunks.jsonl files are kept here, keyed by repo, and reused while
+# the blob's generation is unchanged
+CACHE_DIR = os.getenv('OTTO_CACHE_DIR', os.path.join(os.path.expanduser('~'), '.cache', 'otto'))
+
+
+def _iter_mmap_lines(path):
+    """Yield lines from a local file through a read-only memory map"""
+    if os.path.getsize(path) == 0:
+        return
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        yield from iter(mm.readline, b"")
+
+
+def iter_blob_lines(blob, cache_dir):
+    """
+    Yield raw lines from a blob, serving them from the local cache when the
+    cached copy matches the blob's current generation
+    """
+    blob.reload()
+    
+    cache_path = os.path.join(cache_dir, "chunks.jsonl")
+    generation_path = os.path.join(cache_dir, "generation")
+    
+    if os.path.exists(cache_path) and os.path.exists(generation_path):
+        with open(generation_path) as f:
+            if f.read().strip() == str(blob.generation):
+                yield from _iter_mmap_lines(cache_path)
+                return
+    
+    os.makedirs(cache_dir, exist_ok=True)
+    partial_path = cache_path + ".part"
+    streamed = (blob.size or 0) < PARALLEL_DOWNLOAD_THRESHOLD
+    
+    if streamed:
+        # Parse while streaming, writing each block through to the cache.
+        # The blob reader has no readline, so lines are split out of whole
+        # blocks rather than iterating the reader one byte at a time
+        with blob.open("rb", chunk_size=GCS_READ_CHUNK_SIZE) as src, open(partial_path, "wb") as dst:
+            tail = b""
+            while True:
+                block = src.read(GCS_READ_CHUNK_SIZE)
+                if not block:
+                    break
+                dst.write(block)
+                lines = (tail + block).split(b"\n")
+                tail = lines.pop()
+                yield from lines
+            if tail:
+                yield tail
+    else:
+        transfer_manager.download_chunks_concurrently(
+            blob,
+            partial_path,
+            chunk_size=PARALLEL_DOWNLOAD_CHUNK_SIZE,
+            worker_type=transfer_manager.THREAD,
+            max_workers=PARALLEL_DOWNLOAD_WORKERS,
+        )
+    
+    os.replace(partial_path, cache_path)
+    with open(generation_path, "w") as f:
+        f.write(str(blob.generation))
+    
+    if not streamed:
+        yield from _iter_mmap_lines(cache_path)
+
+
+# Matches a chunk's embedding vector so it can be replaced with a flag before
+# parsing; the report only needs to know whether one is present
+EMBEDDING_FIELD_RE = re.compile(rb'"embedding":\s*\[([^\]]*)\]')
+
+
+def _embedding_flag(match):
+    return b'"embedding": true' if match.group(1).strip() else b'"embedding": false'
+
+
+def parse_chunk_line(line):
+    """Parse a chunks.jsonl line without decoding its embedding floats"""
+    if b'"embedding":' in line:
+        line = EMBEDDING_FIELD_RE.sub(_embedding_flag, line, count=1)
+    return orjson.loads(line)
+
+
+SEMANTIC_CHUNK_TYPES = frozenset({
+    'function_definition', 'class_definition', 'method_definition'
+})
+
+
+def collect_chunk_stats(chunks, sample_size=5):
+    """Gather every counter used by the report in a single pass over the chunks"""
+    with_imports = with_classes = with_functions = with_embeddings = 0
+    semantic = with_import_context = 0
+    chunk_types = Counter()
+    samples = []
+    
+    # Per-chunk sizes are appended to compact int64 columns and reduced in one
+    # fused kernel after the pass instead of summed/compared in Python
+    content_lens = array('q')
+    enriched_lens = array('q')
+    num_lines = array('q')
+    
+    # Counters live in locals and each chunk's .get is bound once, so the
+    # loop body does no attribute lookups or stats-dict writes
+    for chunk in chunks:
+        get = chunk.get
+        content_len = len(chunk['content'])
+        chunk_type = get('chunk_type', 'unknown')
+        
+        content_lens.append(content_len)
+        enriched_lens.append(len(chunk['enriched_content']))
+        num_lines.append(chunk['num_lines'])
+        chunk_types[chunk_type] += 1
+        
+        if get('file_imports'):
+            with_imports += 1
+            if content_len > 100:
+                with_import_context += 1
+        if get('file_classes'):
+            with_classes += 1
+        if get('file_functions'):
+            with_functions += 1
+        if get('embedding'):
+            with_embeddings += 1
+        if chunk_type in SEMANTIC_CHUNK_TYPES:
+            semantic += 1
+        
+        if len(samples) < sample_size:
+            samples.append(chunk)
+    
+    sum_content, sum_enriched, small, self_contained = compute_length_stats(
+        np.asarray(content_lens, dtype=np.int64),
+        np.asarray(enriched_lens, dtype=np.int64),
+        np.asarray(num_lines, dtype=np.int64),
+    )
+    
+    return {
+        'total': len(content_lens),
+        'sum_content': sum_content,
+        'sum_enriched': sum_enriched,
+        'with_imports': with_imports,
+        'with_classes': with_classes,
+        'with_functions': with_functions,
+        'with_embeddings': with_embeddings,
+        'semantic': semantic,
+        'with_import_context': with_import_context,
+        'small': small,
+        'self_contained': self_contained,
+        'chunk_types': chunk_types,
+        'samples': samples,
+    }
+
 
 def analyze_chunk_quality(repo_path, sample_size=5):
     """Analyze if chunks have enough context for LLM tasks"""
@@ -22,117 +193,119 @@ def analyze_chunk_quality(repo_path, sample_size=5):
     bucket = client.bucket(bucket_name)
     blob = bucket.blob(f"{repo_path}/chunks.jsonl")
     
-    content = blob.download_as_text()
-    chunks = [json.loads(line) for line in content.split('\n') if line.strip()]
+    # Fold each chunk into the counters as it is parsed, so the full chunk
+    # list is never built. orjson parses the raw bytes, skipping a utf-8
+    # decode per line.
+    lines = iter_blob_lines(blob, os.path.join(CACHE_DIR, repo_path))
+    stats = collect_chunk_stats(
+        (parse_chunk_line(line) for line in lines if line.strip()), sample_size
+    )
+    
+    total = stats['total']
     
-    print(f"{'='*80}")
-    print(f"CHUNK QUALITY ANALYSIS: {repo_path}")
-    print(f"{'='*80}\n")
+    # The report is collected and written with a single stdout call
+    out = []
+    out.append(SEP_EQ)
+    out.append(f"CHUNK QUALITY ANALYSIS: {repo_path}")
+    out.append(f"{SEP_EQ}\n")
     
     # Overall statistics
-    print("📊 STATISTICS:")
-    print(f"  Total chunks: {len(chunks)}")
-    print(f"  Avg content size: {sum(len(c['content']) for c in chunks) / len(chunks):.0f} chars")
-    print(f"  Avg enriched size: {sum(len(c['enriched_content']) for c in chunks) / len(chunks):.0f} chars")
+    out.append("📊 STATISTICS:")
+    out.append(f"  Total chunks: {total}")
+    out.append(f"  Avg content size: {stats['sum_content'] / total:.0f} chars")
+    out.append(f"  Avg enriched size: {stats['sum_enriched'] / total:.0f} chars")
     
     # Check what context is included
-    with_imports = sum(1 for c in chunks if c.get('file_imports'))
-    with_classes = sum(1 for c in chunks if c.get('file_classes'))
-    with_functions = sum(1 for c in chunks if c.get('file_functions'))
-    with_embeddings = sum(1 for c in chunks if c.get('embedding'))
-    
-    print(f"\n📋 CONTEXT COVERAGE:")
-    print(f"  With imports: {with_imports}/{len(chunks)} ({with_imports/len(chunks)*100:.1f}%)")
-    print(f"  With class info: {with_classes}/{len(chunks)} ({with_classes/len(chunks)*100:.1f}%)")
-    print(f"  With function info: {with_functions}/{len(chunks)} ({with_functions/len(chunks)*100:.1f}%)")
-    print(f"  With embeddings: {with_embeddings}/{len(chunks)} ({with_embeddings/len(chunks)*100:.1f}%)")
-    
-    # Analyze chunk types
-    chunk_types = {}
-    for chunk in chunks:
-        chunk_type = chunk.get('chunk_type', 'unknown')
-        chunk_types[chunk_type] = chunk_types.get(chunk_type, 0) + 1
+    with_imports = stats['with_imports']
+    with_classes = stats['with_classes']
+    with_functions = stats['with_functions']
+    with_embeddings = stats['with_embeddings']
+    
+    out.append(f"\n📋 CONTEXT COVERAGE:")
+    out.append(f"  With imports: {with_imports}/{total} ({with_imports/total*100:.1f}%)")
+    out.append(f"  With class info: {with_classes}/{total} ({with_classes/total*100:.1f}%)")
+    out.append(f"  With function info: {with_functions}/{total} ({with_functions/total*100:.1f}%)")
+    out.append(f"  With embeddings: {with_embeddings}/{total} ({with_embeddings/total*100:.1f}%)")
     
-    print(f"\n🏷️  CHUNK TYPES:")
-    for ctype, count in sorted(chunk_types.items(), key=lambda x: x[1], reverse=True):
-        print(f"  {ctype}: {count} ({count/len(chunks)*100:.1f}%)")
+    out.append(f"\n🏷️  CHUNK TYPES:")
+    for ctype, count in stats['chunk_types'].most_common():
+        out.append(f"  {ctype}: {count} ({count/total*100:.1f}%)")
     
     # Sample chunks for quality review
-    print(f"\n{'='*80}")
-    print(f"SAMPLE CHUNKS (showing {sample_size}):")
-    print(f"{'='*80}\n")
-    
-    for i, chunk in enumerate(chunks[:sample_size], 1):
-        print(f"{'─'*80}")
-        print(f"CHUNK {i}: {chunk['file_path']}")
-        print(f"{'─'*80}")
-        print(f"Type: {chunk['chunk_type']}")
-        print(f"Name: {chunk['chunk_name']}")
-        print(f"Lines: {chunk['start_line']}-{chunk['end_line']} ({chunk['num_lines']} lines)")
-        print(f"Language: {chunk['language']}")
-        print(f"\nContext Available:")
-        print(f"  Imports: {', '.join(chunk.get('file_imports', [])[:3]) or 'None'}")
-        print(f"  Classes: {', '.join(chunk.get('file_classes', [])) or 'None'}")
-        print(f"  Functions: {', '.join(chunk.get('file_functions', [])[:5]) or 'None'}")
+    out.append(f"\n{SEP_EQ}")
+    out.append(f"SAMPLE CHUNKS (showing {sample_size}):")
+    out.append(f"{SEP_EQ}\n")
+    
+    for i, chunk in enumerate(stats['samples'], 1):
+        out.append(SEP_DASH)
+        out.append(f"CHUNK {i}: {chunk['file_path']}")
+        out.append(SEP_DASH)
+        out.append(f"Type: {chunk['chunk_type']}")
+        out.append(f"Name: {chunk['chunk_name']}")
+        out.append(f"Lines: {chunk['start_line']}-{chunk['end_line']} ({chunk['num_lines']} lines)")
+        out.append(f"Language: {chunk['language']}")
+        out.append(f"\nContext Available:")
+        out.append(f"  Imports: {', '.join(chunk.get('file_imports', [])[:3]) or 'None'}")
+        out.append(f"  Classes: {', '.join(chunk.get('file_classes', [])) or 'None'}")
+        out.append(f"  Functions: {', '.join(chunk.get('file_functions', [])[:5]) or 'None'}")
         
-        print(f"\nEnriched Content Preview (first 500 chars):")
-        print("─" * 80)
+        out.append(f"\nEnriched Content Preview (first 500 chars):")
+        out.append(SEP_DASH)
         preview = chunk['enriched_content'][:500]
-        print(preview)
+        out.append(preview)
         if len(chunk['enriched_content']) > 500:
-            print(f"\n... (truncated, total {len(chunk['enriched_content'])} chars)")
-        print()
+            out.append(f"\n... (truncated, total {len(chunk['enriched_content'])} chars)")
+        out.append("")
     
     # Assess quality for specific tasks
-    print(f"\n{'='*80}")
-    print("TASK READINESS ASSESSMENT:")
-    print(f"{'='*80}\n")
+    out.append(f"\n{SEP_EQ}")
+    out.append("TASK READINESS ASSESSMENT:")
+    out.append(f"{SEP_EQ}\n")
     
-    assess_documentation_readiness(chunks)
-    assess_code_completion_readiness(chunks)
-    assess_qa_readiness(chunks)
+    assess_documentation_readiness(stats, out)
+    assess_code_completion_readiness(stats, out)
+    assess_qa_readiness(stats, out)
     
-    return chunks
+    sys.stdout.write("\n".join(out) + "\n")
+    return stats
 
 
-def assess_documentation_readiness(chunks):
+def assess_documentation_readiness(stats, out):
     """Check if chunks are good for generating documentation"""
-    print("📝 DOCUMENTATION GENERATION:")
+    out.append("📝 DOCUMENTATION GENERATION:")
     
     # For documentation, we need:
     # 1. Function/class definitions with their full context
     # 2. Related imports to understand dependencies
     # 3. Surrounding code for understanding purpose
     
-    semantic_chunks = [c for c in chunks if c['chunk_type'] in [
-        'function_definition', 'class_definition', 'method_definition'
-    ]]
-    
-    chunks_with_context = [c for c in chunks if c.get('file_imports') and len(c['content']) > 100]
+    total = stats['total']
+    semantic_chunks = stats['semantic']
+    chunks_with_context = stats['with_import_context']
     
-    print(f"  ✓ Semantic chunks (functions/classes): {len(semantic_chunks)}/{len(chunks)} "
-          f"({len(semantic_chunks)/len(chunks)*100:.1f}%)")
-    print(f"  ✓ Chunks with import context: {chunks_with_context}/{len(chunks)} "
-          f"({len(chunks_with_context)/len(chunks)*100:.1f}%)")
+    out.append(f"  ✓ Semantic chunks (functions/classes): {semantic_chunks}/{total} "
+               f"({semantic_chunks/total*100:.1f}%)")
+    out.append(f"  ✓ Chunks with import context: {chunks_with_context}/{total} "
+               f"({chunks_with_context/total*100:.1f}%)")
     
-    if len(semantic_chunks) > len(chunks) * 0.3:
-        print("  ✅ GOOD: High semantic chunk ratio - good for documentation")
+    if semantic_chunks > total * 0.3:
+        out.append("  ✅ GOOD: High semantic chunk ratio - good for documentation")
     else:
-        print("  ⚠️  MODERATE: Lower semantic chunks - may need improvement")
+        out.append("  ⚠️  MODERATE: Lower semantic chunks - may need improvement")
     
     # Check average context size
-    avg_enriched = sum(len(c['enriched_content']) for c in chunks) / len(chunks)
+    avg_enriched = stats['sum_enriched'] / total
     if avg_enriched > 1500:
-        print(f"  ✅ GOOD: Rich context ({avg_enriched:.0f} chars avg)")
+        out.append(f"  ✅ GOOD: Rich context ({avg_enriched:.0f} chars avg)")
     else:
-        print(f"  ⚠️  MODERATE: Context could be richer ({avg_enriched:.0f} chars avg)")
+        out.append(f"  ⚠️  MODERATE: Context could be richer ({avg_enriched:.0f} chars avg)")
     
-    print()
+    out.append("")
 
 
-def assess_code_completion_readiness(chunks):
+def assess_code_completion_readiness(stats, out):
     """Check if chunks are good for code completion"""
-    print("💻 CODE COMPLETION:")
+    out.append("💻 CODE COMPLETION:")
     
     # For code completion, we need:
     # 1. Full function signatures and bodies
@@ -140,32 +313,32 @@ def assess_code_completion_readiness(chunks):
     # 3. Variable and class definitions in scope
     # 4. Smaller, more focused chunks
     
-    small_chunks = [c for c in chunks if c['num_lines'] < 100]
-    with_imports = [c for c in chunks if c.get('file_imports')]
+    total = stats['total']
+    small_chunks = stats['small']
+    with_imports = stats['with_imports']
     
-    print(f"  ✓ Focused chunks (<100 lines): {len(small_chunks)}/{len(chunks)} "
-          f"({len(small_chunks)/len(chunks)*100:.1f}%)")
-    print(f"  ✓ Chunks with import context: {len(with_imports)}/{len(chunks)} "
-          f"({len(with_imports)/len(chunks)*100:.1f}%)")
+    out.append(f"  ✓ Focused chunks (<100 lines): {small_chunks}/{total} "
+               f"({small_chunks/total*100:.1f}%)")
+    out.append(f"  ✓ Chunks with import context: {with_imports}/{total} "
+               f"({with_imports/total*100:.1f}%)")
     
-    if len(with_imports) > len(chunks) * 0.7:
-        print("  ✅ GOOD: Most chunks have import context")
+    if with_imports > total * 0.7:
+        out.append("  ✅ GOOD: Most chunks have import context")
     else:
-        print("  ⚠️  NEEDS IMPROVEMENT: Add more import/dependency context")
+        out.append("  ⚠️  NEEDS IMPROVEMENT: Add more import/dependency context")
     
     # Check if we have function/class names
-    with_functions = [c for c in chunks if c.get('file_functions')]
-    if len(with_functions) > len(chunks) * 0.5:
-        print("  ✅ GOOD: Function context available for intelligent completion")
+    if stats['with_functions'] > total * 0.5:
+        out.append("  ✅ GOOD: Function context available for intelligent completion")
     else:
-        print("  ⚠️  NEEDS IMPROVEMENT: Add more function/class context")
+        out.append("  ⚠️  NEEDS IMPROVEMENT: Add more function/class context")
     
-    print()
+    out.append("")
 
 
-def assess_qa_readiness(chunks):
+def assess_qa_readiness(stats, out):
     """Check if chunks are good for Q&A"""
-    print("❓ CODE Q&A / SEARCH:")
+    out.append("❓ CODE Q&A / SEARCH:")
     
     # For Q&A, we need:
     # 1. Self-contained chunks with full context
@@ -173,27 +346,28 @@ def assess_qa_readiness(chunks):
     # 3. File-level context
     # 4. Embeddings for semantic search
     
-    with_embeddings = [c for c in chunks if c.get('embedding')]
-    self_contained = [c for c in chunks if len(c['enriched_content']) > 1000]
+    total = stats['total']
+    with_embeddings = stats['with_embeddings']
+    self_contained = stats['self_contained']
     
-    print(f"  ✓ With embeddings: {len(with_embeddings)}/{len(chunks)} "
-          f"({len(with_embeddings)/len(chunks)*100:.1f}%)")
-    print(f"  ✓ Self-contained chunks (>1000 chars): {len(self_contained)}/{len(chunks)} "
-          f"({len(self_contained)/len(chunks)*100:.1f}%)")
+    out.append(f"  ✓ With embeddings: {with_embeddings}/{total} "
+               f"({with_embeddings/total*100:.1f}%)")
+    out.append(f"  ✓ Self-contained chunks (>1000 chars): {self_contained}/{total} "
+               f"({self_contained/total*100:.1f}%)")
     
-    if len(with_embeddings) == len(chunks):
-        print("  ✅ EXCELLENT: All chunks have embeddings for semantic search")
-    elif len(with_embeddings) > 0:
-        print("  ⚠️  PARTIAL: Some chunks missing embeddings")
+    if with_embeddings == total:
+        out.append("  ✅ EXCELLENT: All chunks have embeddings for semantic search")
+    elif with_embeddings > 0:
+        out.append("  ⚠️  PARTIAL: Some chunks missing embeddings")
     else:
-        print("  ❌ NEEDS EMBEDDINGS: Run embed_repo.py to enable semantic search")
+        out.append("  ❌ NEEDS EMBEDDINGS: Run embed_repo.py to enable semantic search")
     
-    if len(self_contained) > len(chunks) * 0.6:
-        print("  ✅ GOOD: Most chunks are self-contained with rich context")
+    if self_contained > total * 0.6:
+        out.append("  ✅ GOOD: Most chunks are self-contained with rich context")
     else:
-        print("  ⚠️  MODERATE: Consider larger chunks or more context")
+        out.append("  ⚠️  MODERATE: Consider larger chunks or more context")
     
-    print()
+    out.append("")
 
 
 if __name__ == '__main__':
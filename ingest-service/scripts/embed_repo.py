@@ -5,21 +5,27 @@ Add embeddings to chunked repository
 import os
 import sys
 import argparse
+import logging
 from dotenv import load_dotenv
 import config
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
-from src.chunking.embedder import ChunkEmbedder
-
 load_dotenv()
 
+logging.basicConfig(level=logging.WARNING, format='%(message)s')
+logger = logging.getLogger(__name__)
+
 
 def main():
     parser = argparse.ArgumentParser(description='Generate embeddings for chunks')
     parser.add_argument('repo', help='Repository path (owner/repo)')
     parser.add_argument('--force', action='store_true', help='Re-embed existing embeddings')
-    parser.add_argument('--batch-size', type=int, default=25, help='Batch size (default: 25)')
+    parser.add_argument('--batch-size', type=int, default=250, help='Max texts per request (default: 250)')
+    parser.add_argument('--max-batch-tokens', type=int, default=15000,
+                        help='Pack each request up to this many estimated tokens, leaving headroom under '
+                             "Vertex's 20k per-request limit; 0 for fixed-size batches (default: 15000)")
+    parser.add_argument('--workers', type=int, default=8, help='Concurrent embedding requests (default: 8)')
     parser.add_argument('--project-id', default=config.getenv('PROJECT_ID'))
     parser.add_argument('--bucket', default=config.getenv('BUCKET_PROCESSED'))
     parser.add_argument('--location', default=config.LOCATION)
@@ -30,9 +36,14 @@ def main():
         print("Error: PROJECT_ID and BUCKET_PROCESSED must be set")
         sys.exit(1)
     
+    # Imported here so --help and argument errors don't pay for loading Vertex AI
+    from src.chunking.embedder import ChunkEmbedder
+    
     # Create embedder
     embedder = ChunkEmbedder(args.project_id, args.bucket, args.location)
     embedder.batch_size = args.batch_size
+    embedder.max_workers = args.workers
+    embedder.max_batch_tokens = args.max_batch_tokens or None
     
     try:
         stats = embedder.embed_repository(args.repo, args.force)
@@ -41,10 +52,8 @@ def main():
             sys.exit(1)
         sys.exit(0)
         
-    except Exception as e:
-        print(f"\n❌ Error: {e}")
-        import traceback
-        traceback.print_exc()
+    except Exception:
+        logger.exception("\n❌ Error")
         sys.exit(1)
 
 
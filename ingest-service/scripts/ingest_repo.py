@@ -8,8 +8,6 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 # Load configuration (loads shared .env + local .env.local)
 import config
 
-from src.ingestion.github_ingester import GitHubIngester
-
 
 def main():
     parser = argparse.ArgumentParser(description='Ingest GitHub repository')
@@ -25,6 +23,9 @@ def main():
         print("Error: GCP_PROJECT_ID and GCS_BUCKET_RAW must be set in otto/.env")
         sys.exit(1)
     
+    # Imported here so --help and argument errors don't pay for loading the GCP/GitHub SDKs
+    from src.ingestion.github_ingester import GitHubIngester
+    
     ingester = GitHubIngester(args.project_id, args.bucket, args.token)
     
     try:
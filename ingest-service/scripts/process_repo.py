@@ -5,6 +5,7 @@ Process repository into enriched chunks
 import os
 import sys
 import argparse
+import logging
 from dotenv import load_dotenv
 import config
 
@@ -14,6 +15,9 @@ from src.chunking.enhanced_chunker import EnhancedCodeChunker  # Changed import
 
 load_dotenv()
 
+logging.basicConfig(level=logging.WARNING, format='%(message)s')
+logger = logging.getLogger(__name__)
+
 
 def main():
     parser = argparse.ArgumentParser(description='Chunk repository with enhanced context')
@@ -46,10 +50,8 @@ def main():
     try:
         chunks = chunker.process_repository(args.repo)
         sys.exit(0)
-    except Exception as e:
-        print(f"\n❌ Error: {e}")
-        import traceback
-        traceback.print_exc()
+    except Exception:
+        logger.exception("\n❌ Error")
         sys.exit(1)
 
 
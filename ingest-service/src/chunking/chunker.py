@@ -2,12 +2,95 @@
 Pure chunking module - No embeddings, just smart code chunking
 """
 import hashlib
-import json
+import os
 import re
+import threading
 import time
-from typing import List, Dict
+from bisect import bisect_right
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from collections import Counter
+from typing import List, Dict, Optional
+import orjson
 from google.cloud import storage
 
+from ..utils.storage_utils import create_storage_client, write_jsonl_blob
+
+
+# File-context patterns, compiled once and applied to every scanned line
+_CLASS_RE = re.compile(r'class\s+(\w+)')
+_JS_IMPORT_RE = re.compile(r'from\s+[\'"](.+?)[\'"]')
+_JS_FUNC_RE = re.compile(r'(?:function|const|let|var)\s+(\w+)')
+_JAVA_IMPORT_RE = re.compile(r'import\s+([\w.]+)')
+
+# Python file context in one pass: each line is classified by whichever
+# alternative matches at its start (imports/classes/defs may be indented,
+# constants must start the line)
+_PY_CONTEXT_RE = re.compile(
+    r'^(?:[ \t]*(?:'
+    r'(?:from|import)[ \t]+(?P<imp>[\w.]+)'
+    r'|class[ \t]+(?P<cls>\w+)'
+    r'|def[ \t]+(?P<fn>\w+)'
+    r')|(?P<const>[A-Z_]+)[ \t]*=[^\n]*)',
+    re.M
+)
+
+# Lines where a line chunk may end: blank, a lone closing bracket, or the start
+# of a definition (surrounding whitespace ignored)
+_BOUNDARY_LINE_RE = re.compile(
+    r'^[^\S\n]*(?:$|[}\])][^\S\n]*$|(?:class|def|function) [^\n]*[^\s])',
+    re.M
+)
+
+# Number of leading lines scanned for file-level context
+FILE_CONTEXT_LINES = 100
+
+# Extracted file contexts kept for identical content (vendored copies,
+# re-ingestion of unchanged files)
+FILE_CONTEXT_CACHE_SIZE = 256
+
+
+def _head_lines(content: str, num_lines: int) -> str:
+    """The first num_lines lines of content, without splitting the whole file"""
+    end = -1
+    for _ in range(num_lines):
+        end = content.find('\n', end + 1)
+        if end == -1:
+            return content
+    return content[:end]
+
+# tree-sitter node types emitted as their own chunks
+SEMANTIC_NODE_TYPES = frozenset({
+    'function_definition', 'class_definition', 'method_definition',
+    'function_declaration', 'class_declaration', 'function_item'
+})
+
+
+def _line_start_offsets(content: str) -> List[int]:
+    """Character offset of the start of every line in content"""
+    offsets = [0]
+    append = offsets.append
+    pos = content.find('\n')
+    while pos != -1:
+        append(pos + 1)
+        pos = content.find('\n', pos + 1)
+    return offsets
+
+
+def _slice_lines(content: str, line_starts: List[int], start: int, end: int) -> str:
+    """Lines [start, end) of content, the same text as joining lines[start:end] with newlines"""
+    if end <= start:
+        return ''
+    stop = line_starts[end] - 1 if end < len(line_starts) else len(content)
+    return content[line_starts[start]:stop]
+
+
+def _boundary_lines(content: str, line_starts: List[int]) -> bytearray:
+    """One byte per line, set to 1 where _BOUNDARY_LINE_RE matches"""
+    boundary = bytearray(len(line_starts))
+    for m in _BOUNDARY_LINE_RE.finditer(content):
+        boundary[bisect_right(line_starts, m.start()) - 1] = 1
+    return boundary
+
 
 class CodeChunker:
     """
@@ -15,7 +98,8 @@ class CodeChunker:
     Handles: Ingestion → Chunking → Context Building → Storage
     """
     
-    def __init__(self, project_id: str, bucket_raw: str, bucket_processed: str):
+    def __init__(self, project_id: str, bucket_raw: str, bucket_processed: str,
+                 storage_client: Optional[storage.Client] = None):
         """
         Initialize the chunker
         
@@ -23,37 +107,100 @@ class CodeChunker:
             project_id: GCP project ID
             bucket_raw: Bucket with raw ingested files
             bucket_processed: Bucket for processed chunks
+            storage_client: Existing Cloud Storage client to reuse (optional)
         """
         self.project_id = project_id
         self.bucket_raw = bucket_raw
         self.bucket_processed = bucket_processed
         
-        self.storage_client = storage.Client(project=project_id)
-        self.parsers = {}
+        self.storage_client = storage_client or create_storage_client(project_id)
+        self._raw_bucket = self.storage_client.bucket(bucket_raw)
+        self._proc_bucket = self.storage_client.bucket(bucket_processed)
+        self._context_cache = {}  # (language, hash(content)) -> (content, file context)
+        self._context_cache_lock = threading.Lock()
+        self.parser_languages = set()  # languages with a tree-sitter grammar
+        self._thread_parsers = threading.local()  # tree-sitter parsers aren't thread-safe
         
         # Chunking settings
         self.chunk_size = 150  # lines per chunk
         self.overlap_lines = 10  # overlap between chunks
+        self.io_threads = int(os.environ.get('CHUNK_IO_THREADS', 32))  # concurrent file downloads
         
         self._load_parsers()
     
     def _load_parsers(self):
-        """Load tree-sitter parsers for semantic analysis"""
+        """
+        Find which tree-sitter grammars are available for semantic analysis.
+        
+        Only the grammars are checked here; parsers are created lazily by
+        _get_parser, one per thread and language actually chunked.
+        """
         try:
-            from tree_sitter_languages import get_parser
+            from tree_sitter_languages import get_language
             languages = ['python', 'javascript', 'typescript', 'java', 'go', 'rust']
-            loaded = 0
             for lang in languages:
                 try:
-                    self.parsers[lang] = get_parser(lang)
-                    loaded += 1
+                    get_language(lang)
+                    self.parser_languages.add(lang)
                 except Exception:
                     pass
-            if loaded > 0:
-                print(f"✓ Loaded {loaded} language parsers")
+            if self.parser_languages:
+                print(f"✓ Found {len(self.parser_languages)} language grammars")
         except ImportError:
             print("⚠️  tree-sitter not available, using line-based chunking")
     
+    def _get_parser(self, language: str):
+        """Return this thread's tree-sitter parser for a language"""
+        parsers = getattr(self._thread_parsers, 'parsers', None)
+        if parsers is None:
+            parsers = self._thread_parsers.parsers = {}
+        
+        parser = parsers.get(language)
+        if parser is None:
+            from tree_sitter_languages import get_parser
+            parser = parsers[language] = get_parser(language)
+        return parser
+    
+    def _process_file(self, file_meta: Dict, metadata: Dict, repo_context: Dict) -> List[Dict]:
+        """Download, analyze and chunk a single file"""
+        # Read file; the raw bytes are kept for tree-sitter so they are not
+        # re-encoded from the decoded text
+        source = self._read_file_bytes(file_meta['blob_path'])
+        content = source.decode('utf-8')
+        
+        # Extract file-level context
+        file_context = self._cached_file_context(content, file_meta['language'])
+        
+        # Chunk file
+        return self._chunk_file(
+            file_meta['path'],
+            content,
+            file_meta['language'],
+            metadata,
+            file_context,
+            repo_context,
+            source=source
+        )
+    
+    def _cached_file_context(self, content: str, language: str) -> Dict:
+        """
+        _extract_file_context, reusing the result for content seen before.
+        
+        Entries are keyed by hash and confirmed by comparing the content, so
+        a hash collision can't return another file's context.
+        """
+        key = (language, hash(content))
+        cached = self._context_cache.get(key)
+        if cached is not None and cached[0] == content:
+            return cached[1]
+        
+        context = self._extract_file_context(content, language)
+        with self._context_cache_lock:
+            while len(self._context_cache) >= FILE_CONTEXT_CACHE_SIZE:
+                del self._context_cache[next(iter(self._context_cache))]
+            self._context_cache[key] = (content, context)
+        return context
+    
     def process_repository(self, repo_path: str) -> List[Dict]:
         """
         Process a repository into context-rich chunks
@@ -79,41 +226,37 @@ class CodeChunker:
         repo_context = self._build_repo_context(metadata)
         print(f"📊 Primary language: {repo_context['primary_language']}")
         
-        # Process files
-        all_chunks = []
+        # Process files; downloads dominate, so files are fetched and chunked
+        # concurrently. Results are kept per file to preserve output order.
+        file_chunks = [[] for _ in metadata['files']]
         processed_files = 0
+        chunk_count = 0
         
-        for file_meta in metadata['files']:
-            try:
-                # Read file
-                content = self._read_file(file_meta['blob_path'])
-                
-                # Extract file-level context
-                file_context = self._extract_file_context(content, file_meta['language'])
-                
-                # Chunk file
-                chunks = self._chunk_file(
-                    file_meta['path'],
-                    content,
-                    file_meta['language'],
-                    metadata,
-                    file_context,
-                    repo_context
-                )
+        with ThreadPoolExecutor(max_workers=max(1, self.io_threads)) as executor:
+            futures = {
+                executor.submit(self._process_file, file_meta, metadata, repo_context): index
+                for index, file_meta in enumerate(metadata['files'])
+            }
+            
+            for future in as_completed(futures):
+                index = futures[future]
+                try:
+                    file_chunks[index] = future.result()
+                except Exception as e:
+                    print(f"⚠️  Error processing {metadata['files'][index]['path']}: {e}")
+                    continue
                 
-                all_chunks.extend(chunks)
                 processed_files += 1
+                chunk_count += len(file_chunks[index])
                 
                 # Progress
                 if processed_files % 10 == 0 or processed_files == total_files:
                     elapsed = time.time() - start_time
                     rate = processed_files / elapsed if elapsed > 0 else 0
                     print(f"✓ {processed_files}/{total_files} files "
-                          f"({len(all_chunks)} chunks, {rate:.1f} files/sec)")
-                
-            except Exception as e:
-                print(f"⚠️  Error processing {file_meta['path']}: {e}")
-                continue
+                          f"({chunk_count} chunks, {rate:.1f} files/sec)")
+        
+        all_chunks = [chunk for chunks in file_chunks for chunk in chunks]
         
         # Save chunks
         self._save_chunks(repo_path, all_chunks)
@@ -131,12 +274,11 @@ class CodeChunker:
     
     def _build_repo_context(self, metadata: Dict) -> Dict:
         """Build high-level repository context"""
-        languages = {}
+        languages = Counter()
         directories = set()
         
         for file in metadata['files']:
-            lang = file.get('language', 'unknown')
-            languages[lang] = languages.get(lang, 0) + 1
+            languages[file.get('language', 'unknown')] += 1
             
             # Extract directory
             path_parts = file['path'].split('/')
@@ -148,7 +290,7 @@ class CodeChunker:
             'description': metadata.get('repo_info', {}).get('description', ''),
             'primary_language': metadata.get('repo_info', {}).get('language', 'Unknown'),
             'total_files': metadata['total_files'],
-            'languages': languages,
+            'languages': dict(languages),
             'directories': sorted(list(directories))[:20]  # Top 20
         }
     
@@ -162,79 +304,87 @@ class CodeChunker:
             'docstring': None
         }
         
-        lines = content.split('\n')[:100]  # Analyze first 100 lines
+        head = _head_lines(content, FILE_CONTEXT_LINES)  # Analyze first 100 lines
         
         if language == 'python':
-            for line in lines:
-                stripped = line.strip()
-                if stripped.startswith(('import ', 'from ')):
-                    match = re.search(r'(?:from|import)\s+([\w.]+)', line)
-                    if match and len(context['imports']) < 15:
-                        context['imports'].append(match.group(1))
-                elif stripped.startswith('class '):
-                    match = re.search(r'class\s+(\w+)', line)
-                    if match:
-                        context['classes'].append(match.group(1))
-                elif stripped.startswith('def '):
-                    match = re.search(r'def\s+(\w+)', line)
-                    if match and len(context['functions']) < 25:
-                        context['functions'].append(match.group(1))
-                elif '=' in stripped and stripped.isupper():
-                    match = re.search(r'^([A-Z_]+)\s*=', line)
-                    if match and len(context['constants']) < 10:
-                        context['constants'].append(match.group(1))
-        
-        elif language in ['javascript', 'typescript']:
+            for match in _PY_CONTEXT_RE.finditer(head):
+                kind = match.lastgroup
+                if kind == 'imp':
+                    if len(context['imports']) < 15:
+                        context['imports'].append(match.group('imp'))
+                elif kind == 'cls':
+                    context['classes'].append(match.group('cls'))
+                elif kind == 'fn':
+                    if len(context['functions']) < 25:
+                        context['functions'].append(match.group('fn'))
+                elif match.group(0).strip().isupper():
+                    if len(context['constants']) < 10:
+                        context['constants'].append(match.group('const'))
+            return context
+        
+        lines = head.split('\n')
+        
+        if language in ['javascript', 'typescript']:
             for line in lines:
                 if 'import' in line and 'from' in line:
-                    match = re.search(r'from\s+[\'"](.+?)[\'"]', line)
+                    match = _JS_IMPORT_RE.search(line)
                     if match and len(context['imports']) < 15:
                         context['imports'].append(match.group(1))
                 elif 'class ' in line:
-                    match = re.search(r'class\s+(\w+)', line)
+                    match = _CLASS_RE.search(line)
                     if match:
                         context['classes'].append(match.group(1))
-                elif re.search(r'(?:function|const|let|var)\s+(\w+)', line):
-                    match = re.search(r'(?:function|const|let|var)\s+(\w+)', line)
+                else:
+                    match = _JS_FUNC_RE.search(line)
                     if match and len(context['functions']) < 25:
                         context['functions'].append(match.group(1))
         
         elif language == 'java':
             for line in lines:
                 if 'import ' in line:
-                    match = re.search(r'import\s+([\w.]+)', line)
+                    match = _JAVA_IMPORT_RE.search(line)
                     if match and len(context['imports']) < 15:
                         context['imports'].append(match.group(1))
                 elif 'class ' in line:
-                    match = re.search(r'class\s+(\w+)', line)
+                    match = _CLASS_RE.search(line)
                     if match:
                         context['classes'].append(match.group(1))
         
         return context
     
     def _chunk_file(self, file_path: str, content: str, language: str,
-                    metadata: Dict, file_context: Dict, repo_context: Dict) -> List[Dict]:
+                    metadata: Dict, file_context: Dict, repo_context: Dict,
+                    source: Optional[bytes] = None) -> List[Dict]:
         """Chunk a file with context enrichment"""
         
         # Choose chunking strategy
-        if language in self.parsers:
-            base_chunks = self._semantic_chunk(content, language)
+        if language in self.parser_languages:
+            base_chunks = self._semantic_chunk(content, language, source)
         else:
             base_chunks = self._smart_line_chunk(content)
         
-        # Enrich chunks
+        # Enrich chunks; the repo/file header is the same for every chunk
         enriched_chunks = []
+        file_header = self._build_file_header(file_path, file_context, repo_context, language)
+        
+        # File-level fields are sliced once and the same lists shared by
+        # every chunk record of the file (they are only read and serialized)
+        chunk_id_prefix = f"{metadata['repo']}::{file_path}::"
+        file_imports = file_context['imports'][:10]
+        file_classes = file_context['classes']
+        file_functions = file_context['functions'][:15]
         
         for i, chunk in enumerate(base_chunks):
             enriched_content = self._build_enriched_content(
-                chunk, file_path, file_context, repo_context, language
+                chunk, file_path, file_context, repo_context, language,
+                file_header=file_header
             )
             
             enriched_chunks.append({
-                'chunk_id': f"{metadata['repo']}::{file_path}::{i}",
-                'repo': metadata['repo'],
+                # repo and chunk index are encoded in chunk_id rather than
+                # repeated as separate fields on every record
+                'chunk_id': f"{chunk_id_prefix}{i}",
                 'file_path': file_path,
-                'chunk_index': i,
                 'content': chunk['content'],
                 'enriched_content': enriched_content,
                 'chunk_type': chunk['type'],
@@ -243,30 +393,25 @@ class CodeChunker:
                 'start_line': chunk['start_line'],
                 'end_line': chunk['end_line'],
                 'num_lines': chunk['end_line'] - chunk['start_line'],
-                'char_count': len(chunk['content']),
-                'hash': hashlib.md5(chunk['content'].encode()).hexdigest(),
-                'file_imports': file_context['imports'][:10],
-                'file_classes': file_context['classes'],
-                'file_functions': file_context['functions'][:15],
+                'hash': hashlib.blake2b(chunk['content'].encode(), digest_size=16).hexdigest(),
+                'file_imports': file_imports,
+                'file_classes': file_classes,
+                'file_functions': file_functions,
                 'summary': chunk.get('summary', '')[:300],
             })
         
         return enriched_chunks
     
-    def _build_enriched_content(self, chunk: Dict, file_path: str,
-                               file_context: Dict, repo_context: Dict, language: str) -> str:
-        """Build enriched content with full context for LLM understanding"""
-        
-        parts = []
+    def _build_file_header(self, file_path: str, file_context: Dict,
+                           repo_context: Dict, language: str) -> str:
+        """Build the repository and file context lines shared by every chunk of a file"""
         
-        # Repository context
-        parts.append(f"# Repository: {repo_context['repo_name']}")
+        parts = [f"# Repository: {repo_context['repo_name']}"]
         if repo_context['description']:
             parts.append(f"# Description: {repo_context['description']}")
         parts.append(f"# Primary Language: {repo_context['primary_language']}")
         parts.append("")
         
-        # File context
         parts.append(f"# File: {file_path}")
         parts.append(f"# Language: {language}")
         
@@ -280,47 +425,57 @@ class CodeChunker:
             parts.append(f"# Functions: {', '.join(file_context['functions'][:8])}")
         
         parts.append("")
+        return '\n'.join(parts)
+    
+    def _build_enriched_content(self, chunk: Dict, file_path: str,
+                               file_context: Dict, repo_context: Dict, language: str,
+                               file_header: str = None) -> str:
+        """Build enriched content with full context for LLM understanding"""
         
-        # Chunk context
-        parts.append(f"# Code Section: {chunk.get('name', 'code_block')}")
-        parts.append(f"# Type: {chunk['type']}")
-        parts.append(f"# Lines: {chunk['start_line']}-{chunk['end_line']}")
-        
-        if chunk.get('summary'):
-            parts.append(f"# Summary: {chunk['summary']}")
+        if file_header is None:
+            file_header = self._build_file_header(file_path, file_context, repo_context, language)
         
-        parts.append("")
-        parts.append("# Code:")
-        parts.append(chunk['content'])
+        summary = chunk.get('summary')
+        summary_line = f"\n# Summary: {summary}" if summary else ""
         
-        return '\n'.join(parts)
+        return (
+            f"{file_header}\n"
+            f"# Code Section: {chunk.get('name', 'code_block')}\n"
+            f"# Type: {chunk['type']}\n"
+            f"# Lines: {chunk['start_line']}-{chunk['end_line']}"
+            f"{summary_line}\n"
+            f"\n# Code:\n{chunk['content']}"
+        )
     
-    def _semantic_chunk(self, content: str, language: str) -> List[Dict]:
-        """Semantic chunking using tree-sitter"""
-        parser = self.parsers[language]
-        tree = parser.parse(bytes(content, 'utf8'))
+    def _semantic_chunk(self, content: str, language: str,
+                        source: Optional[bytes] = None) -> List[Dict]:
+        """Semantic chunking using tree-sitter; `source` is the UTF-8 encoding of `content`"""
+        parser = self._get_parser(language)
+        if source is None:
+            source = content.encode('utf8')
+        tree = parser.parse(source)
         
         chunks = []
-        lines = content.split('\n')
+        line_starts = _line_start_offsets(content)
+        num_lines = len(line_starts)
         
         def extract_name(node):
             for child in node.children:
                 if child.type == 'identifier':
-                    start = child.start_point
-                    end = child.end_point
-                    return lines[start[0]][start[1]:end[1]]
+                    return source[child.start_byte:child.end_byte].decode('utf8', 'replace')
             return None
         
-        def traverse(node):
+        # Pre-order walk with the native cursor instead of recursing in Python
+        cursor = tree.walk()
+        while True:
+            node = cursor.node
+            
             # Target semantic units
-            if node.type in ['function_definition', 'class_definition',
-                           'method_definition', 'function_declaration',
-                           'class_declaration', 'function_item']:
-                
+            if node.type in SEMANTIC_NODE_TYPES:
                 start = max(0, node.start_point[0] - 2)  # Include context
-                end = min(len(lines), node.end_point[0] + 2)
+                end = min(num_lines, node.end_point[0] + 2)
                 
-                chunk_content = '\n'.join(lines[start:end])
+                chunk_content = _slice_lines(content, line_starts, start, end)
                 name = extract_name(node) or f"{node.type}_{start}"
                 
                 chunks.append({
@@ -332,35 +487,38 @@ class CodeChunker:
                     'end_line': end
                 })
             
-            for child in node.children:
-                traverse(child)
-        
-        traverse(tree.root_node)
-        
-        return chunks if chunks else self._smart_line_chunk(content)
+            if cursor.goto_first_child():
+                continue
+            while not cursor.goto_next_sibling():
+                if not cursor.goto_parent():
+                    return chunks if chunks else self._smart_line_chunk(content, line_starts)
     
-    def _smart_line_chunk(self, content: str) -> List[Dict]:
+    def _smart_line_chunk(self, content: str, line_starts: Optional[List[int]] = None) -> List[Dict]:
         """Smart line-based chunking with overlap"""
-        lines = content.split('\n')
+        # Chunks are sliced straight from content by line offsets rather than
+        # re-joining copies of the split lines
+        if line_starts is None:
+            line_starts = _line_start_offsets(content)
+        num_lines = len(line_starts)
+        boundary = _boundary_lines(content, line_starts)
         chunks = []
         
         i = 0
-        while i < len(lines):
+        while i < num_lines:
             chunk_start = i
-            chunk_end = min(i + self.chunk_size, len(lines))
+            chunk_end = min(i + self.chunk_size, num_lines)
             
-            # Try to end at logical boundaries
-            if chunk_end < len(lines) - 5:
-                for j in range(chunk_end, max(chunk_end - 20, chunk_start), -1):
-                    line = lines[j].strip()
-                    if not line or line in ['}', ']', ')'] or line.startswith(('class ', 'def ', 'function ')):
-                        chunk_end = j + 1
-                        break
+            # Try to end at logical boundaries: the last boundary line among
+            # the (up to) 20 lines ending at chunk_end
+            if chunk_end < num_lines - 5:
+                j = boundary.rfind(1, max(chunk_end - 20, chunk_start) + 1, chunk_end + 1)
+                if j != -1:
+                    chunk_end = j + 1
             
-            chunk_content = '\n'.join(lines[chunk_start:chunk_end])
+            chunk_content = _slice_lines(content, line_starts, chunk_start, chunk_end)
             
             if chunk_content.strip():
-                summary = lines[chunk_start].strip()[:100] if chunk_start < len(lines) else ""
+                summary = _slice_lines(content, line_starts, chunk_start, chunk_start + 1).strip()[:100]
                 
                 chunks.append({
                     'content': chunk_content,
@@ -372,26 +530,22 @@ class CodeChunker:
                 })
             
             # Move forward with overlap
-            i = chunk_end - self.overlap_lines if chunk_end < len(lines) else chunk_end
+            i = chunk_end - self.overlap_lines if chunk_end < num_lines else chunk_end
         
         return chunks
     
     def _load_metadata(self, repo_path: str) -> Dict:
         """Load repository metadata"""
-        bucket = self.storage_client.bucket(self.bucket_raw)
-        blob = bucket.blob(f"{repo_path}/metadata.json")
-        return json.loads(blob.download_as_text())
+        blob = self._raw_bucket.blob(f"{repo_path}/metadata.json")
+        return orjson.loads(blob.download_as_bytes())
     
-    def _read_file(self, blob_path: str) -> str:
-        """Read file from Cloud Storage"""
-        bucket = self.storage_client.bucket(self.bucket_raw)
-        blob = bucket.blob(blob_path)
-        return blob.download_as_text()
+    def _read_file_bytes(self, blob_path: str) -> bytes:
+        """Read raw file bytes from Cloud Storage"""
+        blob = self._raw_bucket.blob(blob_path)
+        return blob.download_as_bytes()
     
     def _save_chunks(self, repo_path: str, chunks: List[Dict]):
         """Save chunks to Cloud Storage"""
-        bucket = self.storage_client.bucket(self.bucket_processed)
-        blob = bucket.blob(f"{repo_path}/chunks.jsonl")
+        blob = self._proc_bucket.blob(f"{repo_path}/chunks.jsonl")
         
-        jsonl = '\n'.join([json.dumps(chunk) for chunk in chunks])
-        blob.upload_from_string(jsonl)
\ No newline at end of file
+        write_jsonl_blob(blob, chunks)
\ No newline at end of file
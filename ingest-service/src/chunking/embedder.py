@@ -2,13 +2,42 @@
 """
 Fast embedding module using Vertex AI (supports batch processing)
 """
-import json
 import time
 import os
-from typing import List, Dict
+import random
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Optional
+import orjson
 from google.cloud import storage
-from google.cloud import aiplatform
-from vertexai.language_models import TextEmbeddingModel
+from google.api_core import exceptions as api_exceptions
+from google.cloud.aiplatform_v1 import PredictionServiceClient
+from google.cloud.aiplatform_v1.services.prediction_service.transports import PredictionServiceGrpcTransport
+from google.protobuf import json_format, struct_pb2
+
+from ..utils.storage_utils import write_jsonl_blob
+
+# Rough characters per token for code and English text; used to estimate token
+# counts without running a tokenizer
+CHARS_PER_TOKEN = 4
+
+# Conservative characters per token used when packing request batches. Code
+# often tokenizes closer to 3 chars per token, and a request over Vertex's
+# per-request token limit is rejected outright
+BATCH_CHARS_PER_TOKEN = 3
+
+EMBEDDING_MODEL = "text-embedding-004"
+
+# Keepalive pings on the single HTTP/2 channel to Vertex AI, so a dropped
+# connection is noticed while batches are in flight rather than on a timeout
+GRPC_CHANNEL_OPTIONS = [
+    ("grpc.keepalive_time_ms", 30000),
+    ("grpc.keepalive_timeout_ms", 10000),
+]
+
+# Matches a chunks.jsonl line whose "embedding" key holds a non-empty array.
+# Quotes inside JSON string values are escaped, so chunk content cannot match.
+_HAS_EMBEDDING_RE = re.compile(rb'"embedding":\s*\[\s*[^\]\s]')
 
 
 class ChunkEmbedder:
@@ -16,36 +45,45 @@ class ChunkEmbedder:
     Generate embeddings using Vertex AI - MUCH FASTER with batch support
     """
     
-    def __init__(self, project_id: str, bucket_processed: str, location: str = 'us-east1'):
+    def __init__(self, project_id: str, bucket_processed: str, location: str = 'us-east1',
+                 storage_client: Optional[storage.Client] = None):
         self.project_id = project_id
         self.bucket_processed = bucket_processed
         self.location = location
         
-        self.storage_client = storage.Client(project=project_id)
-        self.model = None
+        self.storage_client = storage_client or storage.Client(project=project_id)
+        self._proc_bucket = self.storage_client.bucket(bucket_processed)
+        self.client = None
+        self.endpoint = (
+            f"projects/{project_id}/locations/{location}"
+            f"/publishers/google/models/{EMBEDDING_MODEL}"
+        )
         self.initialized = False
         
         # Batch settings for maximum speed
         self.batch_size = 250  # Vertex AI supports up to 250 texts per batch
-        self.max_text_length = 3072  # text-embedding-004 supports up to 3072 tokens
-        
-        # Initialize Vertex AI
-        try:
-            aiplatform.init(project=project_id, location=location)
-            print(f"✓ Vertex AI initialized (project: {project_id}, location: {location})")
-        except Exception as e:
-            print(f"⚠️  Vertex AI init warning: {e}")
+        self.max_text_tokens = 2048  # text-embedding-004 input limit, in tokens
+        self.max_workers = 8  # Concurrent batch requests to Vertex AI
+        self.max_retries = 5  # Backoff retries per request when rate limited
+        self.max_batch_tokens = None  # Pack batches up to this many estimated tokens (None = fixed size)
     
     def initialize_model(self) -> bool:
         if self.initialized:
             return True
         
         try:
-            # Load the embedding model
-            self.model = TextEmbeddingModel.from_pretrained("text-embedding-004")
+            # Call the prediction service over gRPC directly; the SDK model
+            # wrapper adds per-request serialization on top of the same call
+            channel = PredictionServiceGrpcTransport.create_channel(
+                f"{self.location}-aiplatform.googleapis.com:443",
+                options=GRPC_CHANNEL_OPTIONS,
+            )
+            self.client = PredictionServiceClient(
+                transport=PredictionServiceGrpcTransport(channel=channel)
+            )
             
             self.initialized = True
-            print(f"✓ Vertex AI embedding model ready (text-embedding-004)")
+            print(f"✓ Vertex AI embedding model ready ({EMBEDDING_MODEL}, gRPC)")
             print(f"  Batch size: {self.batch_size} (250x faster than one-by-one)")
             return True
             
@@ -62,10 +100,12 @@ class ChunkEmbedder:
         print(f"🎯 EMBEDDING: {repo_path}")
         print(f"{'='*60}")
         
-        chunks = self._load_chunks(repo_path)
+        chunks = self._load_chunks(repo_path, keep_embedded_raw=not force_reembed)
         print(f"📦 Loaded: {len(chunks)} chunks")
         
-        already_embedded = sum(1 for c in chunks if c.get('embedding'))
+        already_embedded = sum(
+            1 for c in chunks if isinstance(c, orjson.Fragment) or c.get('embedding')
+        )
 
         if force_reembed:
             for chunk in chunks:
@@ -76,7 +116,10 @@ class ChunkEmbedder:
         
         if already_embedded > 0 and not force_reembed:
             print(f"✓ {already_embedded} chunks already have embeddings")
-            chunks_to_embed = [c for c in chunks if not c.get('embedding')]
+            chunks_to_embed = [
+                c for c in chunks
+                if not isinstance(c, orjson.Fragment) and not c.get('embedding')
+            ]
         else:
             chunks_to_embed = chunks
         
@@ -124,74 +167,168 @@ class ChunkEmbedder:
         """
         Generate embeddings in batches of 250 (Vertex AI limit).
         MUCH FASTER than one-by-one: 216 chunks in ~10-15 seconds instead of 3-5 minutes!
+        
+        Up to `max_workers` batches are in flight at once; each request mostly
+        waits on Vertex AI, so threads keep the connection busy.
         """
-        print(f"\n🔄 Generating embeddings via Vertex AI (batch size: {self.batch_size})...")
+        print(f"\n🔄 Generating embeddings via Vertex AI (batch size: {self.batch_size}, workers: {self.max_workers})...")
         
         success_count = 0
         failed_count = 0
         start_time = time.time()
         
-        for i in range(0, len(chunks), self.batch_size):
-            batch = chunks[i:i + self.batch_size]
-            
-            # Prepare texts for batch embedding
-            batch_texts = []
-            for chunk in batch:
-                text = chunk.get('enriched_content', chunk['content'])
-                if len(text) > self.max_text_length:
-                    text = text[:self.max_text_length]
-                batch_texts.append(text)
+        # Chunks with identical embedding input (vendored or generated code)
+        # are sent once; the result is copied to the duplicates afterwards
+        max_chars = self._max_text_chars()
+        unique = {}
+        duplicates = []
+        for chunk in chunks:
+            text = chunk.get('enriched_content', chunk['content'])[:max_chars]
+            first = unique.setdefault(text, chunk)
+            if first is not chunk:
+                duplicates.append((chunk, first))
+        
+        if duplicates:
+            print(f"  ♻️  {len(duplicates)} duplicate chunks will reuse embeddings")
+        
+        batches = self._make_batches(list(unique.values()))
+        
+        with ThreadPoolExecutor(max_workers=max(1, self.max_workers)) as executor:
+            results = executor.map(self._embed_batch, batches, range(1, len(batches) + 1))
             
-            try:
-                # ✅ FAST: Embed entire batch at once (250 chunks in ~1 second!)
-                embeddings = self.model.get_embeddings(batch_texts)
-                
-                # Assign embeddings to chunks
-                for j, embedding in enumerate(embeddings):
-                    if j < len(batch):
-                        batch[j]['embedding'] = embedding.values
-                        batch[j]['embedding_model'] = 'text-embedding-004-vertex'
-                        batch[j]['embedding_dim'] = len(embedding.values)
-                        success_count += 1
+            for batch_num, result in enumerate(results, 1):
+                success_count += result['success']
+                failed_count += result['failed']
                 
-                elapsed = time.time() - start_time
-                rate = success_count / elapsed if elapsed > 0 else 0
-                print(f"  ✓ Batch {i//self.batch_size + 1}: {success_count}/{len(chunks)} total ({rate:.1f} chunks/sec)")
-                    
-            except Exception as e:
-                failed_count += len(batch)
-                error_msg = str(e)[:100]
-                print(f"  ❌ Batch {i//self.batch_size + 1} failed: {error_msg}")
-                
-                # Retry with smaller batches on failure
-                if len(batch) > 10:
-                    print(f"     Retrying with smaller batches...")
-                    for chunk in batch:
-                        try:
-                            text = chunk.get('enriched_content', chunk['content'])
-                            if len(text) > self.max_text_length:
-                                text = text[:self.max_text_length]
-                            
-                            embeddings = self.model.get_embeddings([text])
-                            chunk['embedding'] = embeddings[0].values
-                            chunk['embedding_model'] = 'text-embedding-004-vertex'
-                            chunk['embedding_dim'] = len(embeddings[0].values)
-                            success_count += 1
-                            failed_count -= 1
-                        except Exception:
-                            pass
+                if result['ok']:
+                    elapsed = time.time() - start_time
+                    rate = success_count / elapsed if elapsed > 0 else 0
+                    print(f"  ✓ Batch {batch_num}: {success_count}/{len(chunks)} total ({rate:.1f} chunks/sec)")
+        
+        for chunk, first in duplicates:
+            if first.get('embedding'):
+                chunk['embedding'] = first['embedding']
+                chunk['embedding_model'] = first['embedding_model']
+                success_count += 1
+            else:
+                failed_count += 1
         
         return {'success': success_count, 'failed': failed_count}
     
-    def _load_chunks(self, repo_path: str) -> List[Dict]:
-        bucket = self.storage_client.bucket(self.bucket_processed)
-        blob = bucket.blob(f"{repo_path}/chunks.jsonl")
-        content = blob.download_as_text()
-        return [json.loads(line) for line in content.split('\n') if line.strip()]
+    def _max_text_chars(self) -> int:
+        """Character budget that keeps a text within max_text_tokens"""
+        return self.max_text_tokens * CHARS_PER_TOKEN
+    
+    def _make_batches(self, chunks: List[Dict]) -> List[List[Dict]]:
+        """
+        Split chunks into request batches.
+        
+        With max_batch_tokens set, batches are packed by estimated token count
+        (BATCH_CHARS_PER_TOKEN chars per token) so large chunks go out in smaller batches and small
+        chunks in larger ones; batch_size still caps the texts per request.
+        """
+        if not self.max_batch_tokens:
+            return [chunks[i:i + self.batch_size] for i in range(0, len(chunks), self.batch_size)]
+        
+        batches = []
+        batch = []
+        batch_tokens = 0
+        max_chars = self._max_text_chars()
+        
+        for chunk in chunks:
+            text_len = len(chunk.get('enriched_content', chunk['content']))
+            tokens = min(text_len, max_chars) // BATCH_CHARS_PER_TOKEN + 1
+            
+            if batch and (len(batch) >= self.batch_size or batch_tokens + tokens > self.max_batch_tokens):
+                batches.append(batch)
+                batch = []
+                batch_tokens = 0
+            
+            batch.append(chunk)
+            batch_tokens += tokens
+        
+        if batch:
+            batches.append(batch)
+        
+        return batches
+    
+    def _get_embeddings(self, texts: List[str]) -> List[List[float]]:
+        """
+        Call Vertex AI, backing off exponentially (with jitter) on quota errors
+        """
+        instances = [json_format.ParseDict({"content": text}, struct_pb2.Value()) for text in texts]
+        
+        for attempt in range(self.max_retries + 1):
+            try:
+                response = self.client.predict(endpoint=self.endpoint, instances=instances)
+                return [list(p["embeddings"]["values"]) for p in response.predictions]
+            except (api_exceptions.ResourceExhausted, api_exceptions.TooManyRequests):
+                if attempt == self.max_retries:
+                    raise
+                time.sleep(min(2 ** attempt, 30) + random.random())
+    
+    def _embed_batch(self, batch: List[Dict], batch_num: int) -> Dict:
+        """
+        Embed one batch in place, retrying it as two halves if the batch call fails
+        """
+        # Prepare texts for batch embedding (slicing a shorter str is a no-op)
+        max_chars = self._max_text_chars()
+        batch_texts = [chunk.get('enriched_content', chunk['content'])[:max_chars] for chunk in batch]
+        
+        success_count = 0
+        
+        try:
+            # ✅ FAST: Embed entire batch at once (250 chunks in ~1 second!)
+            embeddings = self._get_embeddings(batch_texts)
+            
+            # Assign embeddings to chunks
+            for j, embedding in enumerate(embeddings):
+                if j < len(batch):
+                    batch[j]['embedding'] = embedding
+                    batch[j]['embedding_model'] = 'text-embedding-004-vertex'
+                    success_count += 1
+            
+            return {'success': success_count, 'failed': 0, 'ok': True}
+                
+        except Exception as e:
+            error_msg = str(e)[:100]
+            print(f"  ❌ Batch {batch_num} failed: {error_msg}")
+            
+            if len(batch) == 1:
+                return {'success': 0, 'failed': 1, 'ok': False}
+            
+            # Retry with smaller batches on failure; halving gets an oversized
+            # request under the token limit and isolates a chunk that fails alone
+            print(f"     Retrying as two smaller batches...")
+            mid = len(batch) // 2
+            halves = [self._embed_batch(batch[:mid], batch_num), self._embed_batch(batch[mid:], batch_num)]
+            
+            return {
+                'success': sum(half['success'] for half in halves),
+                'failed': sum(half['failed'] for half in halves),
+                'ok': False
+            }
+    
+    def _load_chunks(self, repo_path: str, keep_embedded_raw: bool = False) -> List:
+        """
+        Load chunks.jsonl. With keep_embedded_raw, lines that already carry an
+        embedding are not parsed; they are kept as orjson.Fragment so
+        _save_chunks writes them back byte-for-byte.
+        """
+        blob = self._proc_bucket.blob(f"{repo_path}/chunks.jsonl")
+        content = blob.download_as_bytes()
+        
+        chunks = []
+        for line in content.split(b'\n'):
+            if not line.strip():
+                continue
+            if keep_embedded_raw and _HAS_EMBEDDING_RE.search(line):
+                chunks.append(orjson.Fragment(line))
+            else:
+                chunks.append(orjson.loads(line))
+        return chunks
     
     def _save_chunks(self, repo_path: str, chunks: List[Dict]):
-        bucket = self.storage_client.bucket(self.bucket_processed)
-        blob = bucket.blob(f"{repo_path}/chunks.jsonl")
-        jsonl = '\n'.join([json.dumps(chunk) for chunk in chunks])
-        blob.upload_from_string(jsonl)
+        blob = self._proc_bucket.blob(f"{repo_path}/chunks.jsonl")
+        write_jsonl_blob(blob, chunks)
         print(f"💾 Saved to: gs://{self.bucket_processed}/{repo_path}/chunks.jsonl")
\ No newline at end of file
@@ -2,9 +2,95 @@
 Enhanced chunker optimized for documentation and code completion
 Extracts: type hints, docstrings, decorators, exceptions, interfaces, exports, globals
 """
-from .chunker import CodeChunker
+from .chunker import CodeChunker, _head_lines
+import heapq
 import re
-from typing import List, Dict
+from functools import lru_cache
+from typing import List, Dict, Optional, Tuple
+
+
+# Files past either limit (generated code, lockfiles, minified bundles) get
+# only the base file context; the enhanced extractors would yield noise
+ENHANCED_CONTEXT_MAX_CHARS = 200_000
+ENHANCED_CONTEXT_MAX_AVG_LINE_CHARS = 500
+
+# Extractor patterns, compiled once at import instead of looked up in the re
+# cache on every call
+_PY_FROM_RE = re.compile(r'from\s+([\w.]+)')
+_PY_DECORATOR_RE = re.compile(r'^[^\S\n]*@([\w.]+)', re.MULTILINE)  # decorator lines
+_PY_FUNC_SIG_RE = re.compile(r'def\s+(\w+)\s*\((.*?)\)\s*(?:->\s*([^:]+))?:', re.MULTILINE | re.DOTALL)
+_PY_PARAM_RE = re.compile(r'(\w+)\s*:\s*([^=]+)')
+_PY_DEF_OR_CLASS_RE = re.compile(r'(def|class)\s+(\w+)')
+# raise / except / custom exception class in one scan of the whole file; a
+# class counts as a custom exception when Exception or Error follows on its line
+_PY_EXC_RE = re.compile(
+    r'raise[^\S\n]+(?P<raised>\w+)'
+    r'|except[^\S\n]+(?P<caught>\w+)'
+    r'|class[^\S\n]+(?=[^\n]*(?:Exception|Error))(?P<custom>\w+)'
+)
+_PY_CLASS_RE = re.compile(r'class\s+(\w+)')
+_COMPARISON_OP_RE = re.compile(r'[=!<>]=')  # ==, !=, <=, >=
+_PY_DEF_RE = re.compile(r'def\s+(\w+)')
+_PY_ASYNC_DEF_RE = re.compile(r'async[^\S\n]+def[^\S\n]+(\w+)')
+
+_JS_FROM_RE = re.compile(r'from\s+[\'"]([^\'"]+)[\'"]')
+_JS_REQUIRE_RE = re.compile(r'require\([\'"]([^\'"]+)[\'"]\)')
+_JS_NAMED_EXPORT_RE = re.compile(r'export\s+(?:const|let|var|function|class|interface|type)\s+(\w+)')
+_JS_DEFAULT_EXPORT_RE = re.compile(r'export\s+default\s+(\w+)')
+_JS_ASYNC_RES = (
+    re.compile(r'async\s+function\s+(\w+)'),
+    re.compile(r'async\s+(\w+)\s*\('),
+    re.compile(r'const\s+(\w+)\s*=\s*async'),
+)
+
+_TS_IFACE_RE = re.compile(r'interface\s+(\w+)')
+_TS_PROP_RE = re.compile(r'(\w+)[?]?\s*:\s*([^;,]+)')
+_TS_TYPE_RE = re.compile(r'type\s+(\w+)\s*=\s*([^;]+)')
+_TS_ENUM_RE = re.compile(r'enum\s+(\w+)')
+_TS_ENUM_VALUE_RE = re.compile(r'(\w+)')
+_TS_GENERIC_RE = re.compile(r'<([A-Z][A-Za-z0-9,\s]+)>')
+
+_JAVA_ANNOTATION_RE = re.compile(r'^[^\S\n]*@(\w+)', re.MULTILINE)  # annotation lines
+_JAVA_IFACE_RE = re.compile(r'interface[^\S\n]+(\w+)')
+
+
+def _split_top_level_commas(s: str) -> List[str]:
+    """Split on commas outside brackets, so `Dict[str, int]` stays one piece"""
+    if '[' not in s and '(' not in s and '{' not in s:
+        return s.split(',')
+    
+    parts = []
+    depth = 0
+    start = 0
+    for i, c in enumerate(s):
+        if c in '([{':
+            depth += 1
+        elif c in ')]}':
+            depth -= 1
+        elif c == ',' and depth == 0:
+            parts.append(s[start:i])
+            start = i + 1
+    parts.append(s[start:])
+    return parts
+
+
+@lru_cache(maxsize=4096)
+def _parse_params(params_str: str) -> Tuple[Tuple[str, str], ...]:
+    """
+    (name, type) pairs for the annotated parameters of a signature.
+    
+    Memoized because parameter lists such as `self, request: Request` repeat
+    across functions and files; returns a tuple so cached results can't be
+    mutated by callers.
+    """
+    params = {}
+    for param in _split_top_level_commas(params_str):
+        param = param.strip()
+        if ':' in param:
+            param_match = _PY_PARAM_RE.search(param)
+            if param_match:
+                params[param_match.group(1)] = param_match.group(2).strip()
+    return tuple(params.items())
 
 
 class EnhancedCodeChunker(CodeChunker):
@@ -20,16 +106,22 @@ class EnhancedCodeChunker(CodeChunker):
         # Get base context
         context = super()._extract_file_context(content, language)
         
+        if (len(content) > ENHANCED_CONTEXT_MAX_CHARS
+                or len(content) > ENHANCED_CONTEXT_MAX_AVG_LINE_CHARS * (content.count('\n') + 1)):
+            return context
+        
         # Add language-specific enhancements
         if language == 'python':
-            context['imports'] = self._extract_python_imports_improved(content)
+            # Split once; the line-based extractors share the list
+            lines = content.split('\n')
+            context['imports'] = self._extract_python_imports_improved(content, lines)
             context.update({
                 'decorators': self._extract_python_decorators(content),
                 'type_hints': self._extract_python_type_hints(content),
-                'docstrings': self._extract_python_docstrings(content),
-                'global_vars': self._extract_python_globals(content),
+                'docstrings': self._extract_python_docstrings(content, lines),
+                'global_vars': self._extract_python_globals(content, lines),
                 'exception_handling': self._extract_python_exceptions(content),
-                'class_methods': self._extract_python_class_methods(content),
+                'class_methods': self._extract_python_class_methods(content, lines),
                 'async_functions': self._extract_python_async(content),
             })
 
@@ -57,12 +149,13 @@ class EnhancedCodeChunker(CodeChunker):
         
         return context
     
-    def _extract_python_imports_improved(self, content: str) -> List[str]:
+    def _extract_python_imports_improved(self, content: str, lines: Optional[List[str]] = None) -> List[str]:
         """Improved Python import extraction - catches more patterns"""
-        imports = []
-        seen = set()
+        if lines is None:
+            lines = content.split('\n')
+        imports = {}  # insertion-ordered set of root modules
         
-        for line in content.split('\n')[:200]:  # Check first 200 lines
+        for line in lines[:200]:  # Check first 200 lines
             stripped = line.strip()
             
             # Skip comments
@@ -72,98 +165,79 @@ class EnhancedCodeChunker(CodeChunker):
             # Pattern 1: import module
             if stripped.startswith('import '):
                 # Handle: import os, sys, json
-                modules = stripped[7:].split(',')
-                for module in modules:
-                    module = module.strip().split()[0].split('.')[0]  # Get root module
-                    if module and module not in seen:
-                        imports.append(module)
-                        seen.add(module)
+                for module in stripped[7:].split(','):
+                    words = module.split(None, 1)  # drop any "as alias"
+                    if words:
+                        module = words[0].split('.')[0]  # Get root module
+                        if module:
+                            imports[module] = None
             
             # Pattern 2: from module import ...
             elif stripped.startswith('from '):
-                match = re.search(r'from\s+([\w.]+)', stripped)
+                match = _PY_FROM_RE.search(stripped)
                 if match:
                     module = match.group(1).split('.')[0]  # Get root module
-                    if module and module not in seen:
-                        imports.append(module)
-                        seen.add(module)
+                    if module:
+                        imports[module] = None
             
             if len(imports) >= 20:
                 break
             
-        return imports
+        return list(imports)
     
     def _extract_js_imports_improved(self, content: str) -> List[str]:
         """Improved JavaScript/TypeScript import extraction"""
-        imports = []
-        seen = set()
+        imports = {}  # insertion-ordered set of package names
         
-        for line in content.split('\n')[:200]:
+        for line in _head_lines(content, 200).split('\n'):
             # Pattern 1: import ... from 'module'
             if 'import' in line and 'from' in line:
-                match = re.search(r'from\s+[\'"]([^\'"]+)[\'"]', line)
+                match = _JS_FROM_RE.search(line)
                 if match:
                     module = match.group(1)
                     # Get package name (before first /)
                     pkg = module.split('/')[0]
-                    if pkg and pkg not in seen and pkg not in ['.', '..']:
-                        imports.append(pkg)
-                        seen.add(pkg)
+                    if pkg and pkg not in ('.', '..'):
+                        imports[pkg] = None
             
             # Pattern 2: require('module')
             elif 'require(' in line:
-                match = re.search(r'require\([\'"]([^\'"]+)[\'"]\)', line)
+                match = _JS_REQUIRE_RE.search(line)
                 if match:
                     module = match.group(1)
                     pkg = module.split('/')[0]
-                    if pkg and pkg not in seen and pkg not in ['.', '..']:
-                        imports.append(pkg)
-                        seen.add(pkg)
+                    if pkg and pkg not in ('.', '..'):
+                        imports[pkg] = None
             
             if len(imports) >= 20:
                 break
             
-        return imports
+        return list(imports)
         
     # ==================== PYTHON EXTRACTORS ====================
     
     def _extract_python_decorators(self, content: str) -> List[str]:
         """Extract Python decorators (e.g., @property, @staticmethod)"""
         decorators = set()
-        for line in content.split('\n'):
-            stripped = line.strip()
-            if stripped.startswith('@'):
-                # Extract decorator name (handle @decorator and @decorator(...))
-                match = re.search(r'@([\w.]+)', line)
-                if match:
-                    decorators.add(match.group(1))
-                    if len(decorators) >= 15:
-                        break
+        # One regex scan over the file (handles @decorator and @decorator(...))
+        for match in _PY_DECORATOR_RE.finditer(content):
+            decorators.add(match.group(1))
+            if len(decorators) >= 15:
+                break
         return sorted(list(decorators))
     
     def _extract_python_type_hints(self, content: str) -> Dict:
         """Extract type hints from function signatures"""
         type_hints = {}
         
-        # Pattern for function with type hints: def func(x: int, y: str) -> bool:
-        pattern = r'def\s+(\w+)\s*\((.*?)\)\s*(?:->\s*([^:]+))?:'
-        
-        for match in re.finditer(pattern, content, re.MULTILINE | re.DOTALL):
+        # Function with type hints: def func(x: int, y: str) -> bool:
+        for match in _PY_FUNC_SIG_RE.finditer(content):
             func_name = match.group(1)
             params_str = match.group(2)
             return_type = match.group(3).strip() if match.group(3) else None
             
             # Parse parameters
-            params = {}
-            if params_str:
-                for param in params_str.split(','):
-                    param = param.strip()
-                    if ':' in param:
-                        param_match = re.search(r'(\w+)\s*:\s*([^=]+)', param)
-                        if param_match:
-                            param_name = param_match.group(1)
-                            param_type = param_match.group(2).strip()
-                            params[param_name] = param_type
+            params = dict(_parse_params(params_str)) if params_str else {}
             
             type_hints[func_name] = {
                 'params': params,
@@ -176,17 +250,21 @@ class EnhancedCodeChunker(CodeChunker):
         
         return type_hints
     
-    def _extract_python_docstrings(self, content: str) -> Dict:
+    def _extract_python_docstrings(self, content: str, lines: Optional[List[str]] = None) -> Dict:
         """Extract docstrings from functions and classes"""
+        if '"""' not in content and "'''" not in content:
+            return {}
+        if lines is None:
+            lines = content.split('\n')
         docstrings = {}
-        lines = content.split('\n')
         
         i = 0
         while i < len(lines):
-            line = lines[i].strip()
+            line = lines[i]
             
-            # Look for function/class definition
-            match = re.search(r'(def|class)\s+(\w+)', line)
+            # Look for function/class definition; the substring test skips
+            # the regex on lines that cannot match
+            match = ('def' in line or 'class' in line) and _PY_DEF_OR_CLASS_RE.search(line)
             if match:
                 def_type = match.group(1)
                 name = match.group(2)
@@ -197,7 +275,7 @@ class EnhancedCodeChunker(CodeChunker):
                     next_line = lines[j].strip()
                     
                     # Found docstring start
-                    if next_line.startswith('"""') or next_line.startswith("'''"):
+                    if next_line.startswith(('"""', "'''")):
                         quote = '"""' if '"""' in next_line else "'''"
                         docstring_lines = [next_line.strip(quote)]
                         
@@ -232,11 +310,14 @@ class EnhancedCodeChunker(CodeChunker):
         
         return docstrings
     
-    def _extract_python_globals(self, content: str) -> List[str]:
+    def _extract_python_globals(self, content: str, lines: Optional[List[str]] = None) -> List[str]:
         """Extract global constants and variables"""
-        globals_vars = []
+        if lines is None:
+            lines = content.split('\n')
+        constants = []
+        variables = []
         
-        for line in content.split('\n')[:150]:
+        for line in lines[:150]:
             line_stripped = line.strip()
             
             # Skip comments, imports, and definitions
@@ -244,21 +325,24 @@ class EnhancedCodeChunker(CodeChunker):
                 continue
             
             # Look for module-level assignments
-            if '=' in line and not any(x in line for x in ['==', '!=', '<=', '>=']):
-                # Match: CONSTANT = value or variable = value
-                match = re.search(r'^([A-Z_][A-Z0-9_]*|[a-z_][a-z0-9_]*)\s*=', line)
-                if match:
-                    var_name = match.group(1)
+            if '=' in line and not _COMPARISON_OP_RE.search(line):
+                # Match: CONSTANT = value or variable = value, i.e. an unindented
+                # ASCII name that is not mixed-case, directly before the first '='
+                var_name = line[:line.index('=')].rstrip()
+                if (var_name.isascii() and var_name.isidentifier()
+                        and (var_name.upper() == var_name or var_name.lower() == var_name)):
                     # Prioritize constants (all caps)
                     if var_name.isupper():
-                        globals_vars.insert(0, var_name)
+                        constants.append(var_name)
                     else:
-                        globals_vars.append(var_name)
+                        variables.append(var_name)
                     
-            if len(globals_vars) >= 20:
+            if len(constants) + len(variables) >= 20:
                 break
         
-        return globals_vars[:20]
+        # Constants first, most recent first (the order repeated insert(0) gave)
+        constants.reverse()
+        return (constants + variables)[:20]
     
     def _extract_python_exceptions(self, content: str) -> Dict:
         """Extract exception handling information"""
@@ -268,44 +352,38 @@ class EnhancedCodeChunker(CodeChunker):
             'custom': []
         }
         
-        lines = content.split('\n')
-        
-        for i, line in enumerate(lines):
-            # Find raise statements
-            if 'raise ' in line:
-                match = re.search(r'raise\s+(\w+)', line)
-                if match:
-                    exceptions['raised'].add(match.group(1))
-            
-            # Find except clauses
-            if 'except ' in line:
-                # Handle: except Exception, except (Error1, Error2), except Exception as e
-                matches = re.findall(r'except\s+(\w+)', line)
-                exceptions['caught'].update(matches)
-            
-            # Find custom exception definitions
-            if 'class ' in line and any(x in line for x in ['Exception', 'Error']):
-                match = re.search(r'class\s+(\w+)', line)
-                if match:
-                    exceptions['custom'].append(match.group(1))
+        for match in _PY_EXC_RE.finditer(content):
+            kind = match.lastgroup
+            if kind == 'custom':
+                exceptions['custom'].append(match.group(kind))
+            else:
+                exceptions[kind].add(match.group(kind))
         
         return {
-            'raised': sorted(list(exceptions['raised']))[:10],
-            'caught': sorted(list(exceptions['caught']))[:10],
+            'raised': heapq.nsmallest(10, exceptions['raised']),
+            'caught': heapq.nsmallest(10, exceptions['caught']),
             'custom': exceptions['custom'][:5]
         }
     
-    def _extract_python_class_methods(self, content: str) -> Dict:
+    def _extract_python_class_methods(self, content: str, lines: Optional[List[str]] = None) -> Dict:
         """Extract class methods and their relationships"""
+        if 'class ' not in content:
+            return {}
+        if lines is None:
+            lines = content.split('\n')
         class_methods = {}
         current_class = None
+        decorators = []  # decorator names directly above the current line
         
-        for line in content.split('\n'):
+        for line in lines:
             stripped = line.strip()
             
+            if stripped.startswith('@'):
+                decorators.append(stripped.split('(', 1)[0])
+            
             # New class definition
             if stripped.startswith('class '):
-                match = re.search(r'class\s+(\w+)', line)
+                match = _PY_CLASS_RE.search(line)
                 if match:
                     current_class = match.group(1)
                     class_methods[current_class] = {
@@ -317,16 +395,16 @@ class EnhancedCodeChunker(CodeChunker):
             
             # Method in a class
             elif current_class and stripped.startswith('def '):
-                match = re.search(r'def\s+(\w+)', line)
+                match = _PY_DEF_RE.search(line)
                 if match:
                     method_name = match.group(1)
                     
-                    # Check previous lines for decorators
-                    if '@staticmethod' in content[max(0, content.find(line)-100):content.find(line)]:
+                    # Decorators collected on the lines above this def
+                    if '@staticmethod' in decorators:
                         class_methods[current_class]['static'].append(method_name)
-                    elif '@classmethod' in content[max(0, content.find(line)-100):content.find(line)]:
+                    elif '@classmethod' in decorators:
                         class_methods[current_class]['class_methods'].append(method_name)
-                    elif '@property' in content[max(0, content.find(line)-100):content.find(line)]:
+                    elif '@property' in decorators:
                         class_methods[current_class]['properties'].append(method_name)
                     else:
                         class_methods[current_class]['methods'].append(method_name)
@@ -334,6 +412,10 @@ class EnhancedCodeChunker(CodeChunker):
             # Reset if we're back to module level (no indentation)
             elif not line.startswith((' ', '\t')) and stripped and current_class:
                 current_class = None
+            
+            # Any other code line ends the decorator run
+            if stripped and not stripped.startswith(('@', '#')):
+                decorators = []
         
         return class_methods
     
@@ -341,12 +423,8 @@ class EnhancedCodeChunker(CodeChunker):
         """Extract async function names"""
         async_funcs = []
         
-        for line in content.split('\n'):
-            if 'async def ' in line:
-                match = re.search(r'async\s+def\s+(\w+)', line)
-                if match:
-                    async_funcs.append(match.group(1))
-                    
+        for match in _PY_ASYNC_DEF_RE.finditer(content):
+            async_funcs.append(match.group(1))
             if len(async_funcs) >= 15:
                 break
         
@@ -356,16 +434,18 @@ class EnhancedCodeChunker(CodeChunker):
     
     def _extract_js_exports(self, content: str) -> Dict:
         """Extract JavaScript/TypeScript exports"""
+        if 'export ' not in content:
+            return {'named': [], 'default': None, 'all': []}
         exports = {
             'named': [],
             'default': None,
             'all': []
         }
         
-        for line in content.split('\n')[:200]:
+        for line in _head_lines(content, 200).split('\n'):
             # Named exports: export const/function/class
             if 'export ' in line and 'default' not in line:
-                match = re.search(r'export\s+(?:const|let|var|function|class|interface|type)\s+(\w+)', line)
+                match = _JS_NAMED_EXPORT_RE.search(line)
                 if match:
                     name = match.group(1)
                     exports['named'].append(name)
@@ -373,7 +453,7 @@ class EnhancedCodeChunker(CodeChunker):
             
             # Default export
             if 'export default' in line:
-                match = re.search(r'export\s+default\s+(\w+)', line)
+                match = _JS_DEFAULT_EXPORT_RE.search(line)
                 if match:
                     exports['default'] = match.group(1)
                     exports['all'].append(f'default:{match.group(1)}')
@@ -389,20 +469,16 @@ class EnhancedCodeChunker(CodeChunker):
         """Extract async functions in JavaScript/TypeScript"""
         async_funcs = []
         
-        patterns = [
-            r'async\s+function\s+(\w+)',
-            r'async\s+(\w+)\s*\(',
-            r'const\s+(\w+)\s*=\s*async',
-        ]
-        
-        for pattern in patterns:
-            for match in re.finditer(pattern, content):
+        for pattern in _JS_ASYNC_RES:
+            for match in pattern.finditer(content):
                 async_funcs.append(match.group(1))
         
         return list(set(async_funcs))[:15]
     
     def _extract_ts_interfaces(self, content: str) -> Dict:
         """Extract TypeScript interfaces with their properties"""
+        if 'interface ' not in content:
+            return {}
         interfaces = {}
         
         lines = content.split('\n')
@@ -413,7 +489,7 @@ class EnhancedCodeChunker(CodeChunker):
             
             # Found interface definition
             if 'interface ' in line:
-                match = re.search(r'interface\s+(\w+)', line)
+                match = _TS_IFACE_RE.search(line)
                 if match:
                     interface_name = match.group(1)
                     properties = []
@@ -428,7 +504,7 @@ class EnhancedCodeChunker(CodeChunker):
                             break
                         
                         # Extract property: name: type
-                        prop_match = re.search(r'(\w+)[?]?\s*:\s*([^;,]+)', prop_line)
+                        prop_match = ':' in prop_line and _TS_PROP_RE.search(prop_line)
                         if prop_match:
                             properties.append(f"{prop_match.group(1)}: {prop_match.group(2).strip()}")
                         
@@ -446,9 +522,9 @@ class EnhancedCodeChunker(CodeChunker):
         """Extract TypeScript type definitions"""
         types = {}
         
-        for line in content.split('\n')[:200]:
+        for line in _head_lines(content, 200).split('\n'):
             if 'type ' in line and '=' in line:
-                match = re.search(r'type\s+(\w+)\s*=\s*([^;]+)', line)
+                match = _TS_TYPE_RE.search(line)
                 if match:
                     type_name = match.group(1)
                     type_def = match.group(2).strip()
@@ -461,6 +537,8 @@ class EnhancedCodeChunker(CodeChunker):
     
     def _extract_ts_enums(self, content: str) -> Dict:
         """Extract TypeScript enums"""
+        if 'enum ' not in content:
+            return {}
         enums = {}
         
         lines = content.split('\n')
@@ -470,7 +548,7 @@ class EnhancedCodeChunker(CodeChunker):
             line = lines[i]
             
             if 'enum ' in line:
-                match = re.search(r'enum\s+(\w+)', line)
+                match = _TS_ENUM_RE.search(line)
                 if match:
                     enum_name = match.group(1)
                     values = []
@@ -483,7 +561,7 @@ class EnhancedCodeChunker(CodeChunker):
                         if val_line.startswith('}'):
                             break
                         
-                        val_match = re.search(r'(\w+)', val_line)
+                        val_match = _TS_ENUM_VALUE_RE.search(val_line)
                         if val_match:
                             values.append(val_match.group(1))
                         
@@ -502,7 +580,7 @@ class EnhancedCodeChunker(CodeChunker):
         generics = set()
         
         # Find generic patterns: <T>, <K, V>, etc.
-        for match in re.finditer(r'<([A-Z][A-Za-z0-9,\s]+)>', content):
+        for match in _TS_GENERIC_RE.finditer(content):
             generic = match.group(1)
             generics.add(generic.strip())
         
@@ -514,12 +592,8 @@ class EnhancedCodeChunker(CodeChunker):
         """Extract Java annotations"""
         annotations = set()
         
-        for line in content.split('\n'):
-            if line.strip().startswith('@'):
-                match = re.search(r'@(\w+)', line)
-                if match:
-                    annotations.add(match.group(1))
-                    
+        for match in _JAVA_ANNOTATION_RE.finditer(content):
+            annotations.add(match.group(1))
             if len(annotations) >= 15:
                 break
         
@@ -529,12 +603,8 @@ class EnhancedCodeChunker(CodeChunker):
         """Extract Java interface names"""
         interfaces = []
         
-        for line in content.split('\n')[:200]:
-            if 'interface ' in line:
-                match = re.search(r'interface\s+(\w+)', line)
-                if match:
-                    interfaces.append(match.group(1))
-                    
+        for match in _JAVA_IFACE_RE.finditer(_head_lines(content, 200)):
+            interfaces.append(match.group(1))
             if len(interfaces) >= 15:
                 break
         
@@ -550,7 +620,7 @@ class EnhancedCodeChunker(CodeChunker):
             'final': 0
         }
         
-        for line in content.split('\n')[:300]:
+        for line in _head_lines(content, 300).split('\n'):
             for modifier in modifiers.keys():
                 if modifier in line:
                     modifiers[modifier] += 1
@@ -559,9 +629,9 @@ class EnhancedCodeChunker(CodeChunker):
     
     # ==================== ENHANCED CONTENT BUILDER ====================
     
-    def _build_enriched_content(self, chunk: Dict, file_path: str,
-                               file_context: Dict, repo_context: Dict, language: str) -> str:
-        """Build super-enriched content with all extracted metadata"""
+    def _build_file_header(self, file_path: str, file_context: Dict,
+                           repo_context: Dict, language: str) -> str:
+        """Build the repository and file-level metadata lines shared by every chunk of a file"""
         
         parts = []
         
@@ -607,34 +677,6 @@ class EnhancedCodeChunker(CodeChunker):
                 parts.append(f"# Catches: {', '.join(exceptions['caught'][:5])}")
             if exceptions.get('custom'):
                 parts.append(f"# Custom Exceptions: {', '.join(exceptions['custom'])}")
-            
-            # Type hints for this specific chunk
-            type_hints = file_context.get('type_hints', {})
-            chunk_name = chunk.get('name', '')
-            if chunk_name in type_hints:
-                hint = type_hints[chunk_name]
-                if hint.get('params'):
-                    params_str = ', '.join([f"{k}: {v}" for k, v in list(hint['params'].items())[:5]])
-                    parts.append(f"# Parameters: {params_str}")
-                if hint.get('return_type'):
-                    parts.append(f"# Returns: {hint['return_type']}")
-            
-            # Docstring for this chunk
-            docstrings = file_context.get('docstrings', {})
-            if chunk_name in docstrings:
-                doc = docstrings[chunk_name]
-                parts.append(f"# Docstring: {doc['text'][:150]}")
-            
-            # Class methods context
-            class_methods = file_context.get('class_methods', {})
-            for class_name, methods in class_methods.items():
-                if class_name in chunk.get('content', ''):
-                    if methods.get('methods'):
-                        parts.append(f"# Class {class_name} Methods: {', '.join(methods['methods'][:6])}")
-                    if methods.get('static'):
-                        parts.append(f"# Static Methods: {', '.join(methods['static'])}")
-                    if methods.get('properties'):
-                        parts.append(f"# Properties: {', '.join(methods['properties'])}")
         
         # ===== TYPESCRIPT-SPECIFIC CONTEXT =====
         if language == 'typescript':
@@ -683,18 +725,56 @@ class EnhancedCodeChunker(CodeChunker):
                            f"private={modifiers.get('private', 0)}, "
                            f"protected={modifiers.get('protected', 0)}")
         
-        parts.append("")
+        return '\n'.join(parts)
+    
+    def _build_enriched_content(self, chunk: Dict, file_path: str,
+                               file_context: Dict, repo_context: Dict, language: str,
+                               file_header: str = None) -> str:
+        """Build super-enriched content with all extracted metadata"""
         
-        # ===== CHUNK-SPECIFIC CONTEXT =====
-        parts.append(f"# Code Section: {chunk.get('name', 'code_block')}")
-        parts.append(f"# Type: {chunk['type']}")
-        parts.append(f"# Lines: {chunk['start_line']}-{chunk['end_line']} ({chunk.get('num_lines', 0)} lines)")
+        if file_header is None:
+            file_header = self._build_file_header(file_path, file_context, repo_context, language)
         
-        if chunk.get('summary'):
-            parts.append(f"# Summary: {chunk['summary']}")
+        parts = [file_header]
         
-        parts.append("")
-        parts.append("# ===== CODE =====")
-        parts.append(chunk['content'])
+        # ===== PYTHON CHUNK CONTEXT =====
+        if language == 'python':
+            chunk_name = chunk.get('name', '')
+            
+            # Type hints for this specific chunk
+            hint = file_context.get('type_hints', {}).get(chunk_name)
+            if hint:
+                if hint.get('params'):
+                    params_str = ', '.join([f"{k}: {v}" for k, v in list(hint['params'].items())[:5]])
+                    parts.append(f"# Parameters: {params_str}")
+                if hint.get('return_type'):
+                    parts.append(f"# Returns: {hint['return_type']}")
+            
+            # Docstring for this chunk
+            doc = file_context.get('docstrings', {}).get(chunk_name)
+            if doc:
+                parts.append(f"# Docstring: {doc['text'][:150]}")
+            
+            # Class methods context
+            chunk_content = chunk.get('content', '')
+            for class_name, methods in file_context.get('class_methods', {}).items():
+                if class_name in chunk_content:
+                    if methods.get('methods'):
+                        parts.append(f"# Class {class_name} Methods: {', '.join(methods['methods'][:6])}")
+                    if methods.get('static'):
+                        parts.append(f"# Static Methods: {', '.join(methods['static'])}")
+                    if methods.get('properties'):
+                        parts.append(f"# Properties: {', '.join(methods['properties'])}")
+        
+        # ===== CHUNK-SPECIFIC CONTEXT =====
+        summary = chunk.get('summary')
+        summary_line = f"\n# Summary: {summary}" if summary else ""
+        parts.append(
+            f"\n# Code Section: {chunk.get('name', 'code_block')}\n"
+            f"# Type: {chunk['type']}\n"
+            f"# Lines: {chunk['start_line']}-{chunk['end_line']} ({chunk.get('num_lines', 0)} lines)"
+            f"{summary_line}\n"
+            f"\n# ===== CODE =====\n{chunk['content']}"
+        )
         
         return '\n'.join(parts)
\ No newline at end of file
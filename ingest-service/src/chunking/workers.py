@@ -0,0 +1,39 @@
+"""
+Process-pool entry points for CPU-bound chunking
+
+Functions here are top-level so they can be pickled into worker
+processes; each worker builds its chunker (storage client + tree-sitter
+parsers) once and reuses it for every job it runs.
+"""
+from typing import Optional
+
+from .enhanced_chunker import EnhancedCodeChunker
+
+_worker_chunker: Optional[EnhancedCodeChunker] = None
+
+
+def chunk_repository_worker(project_id: str, bucket_raw: str, bucket_processed: str,
+                            repo_path: str, chunk_size: int, overlap: int) -> int:
+    """
+    Chunk a repository inside a worker process
+    
+    Args:
+        project_id: GCP project ID
+        bucket_raw: Bucket with raw ingested files
+        bucket_processed: Bucket for processed chunks
+        repo_path: Repository path (repos/owner/repo)
+        chunk_size: Lines per chunk
+        overlap: Overlap lines between chunks
+        
+    Returns:
+        Number of chunks written (the chunks themselves stay in GCS)
+    """
+    global _worker_chunker
+    
+    if _worker_chunker is None:
+        _worker_chunker = EnhancedCodeChunker(project_id, bucket_raw, bucket_processed)
+    
+    _worker_chunker.chunk_size = chunk_size
+    _worker_chunker.overlap_lines = overlap
+    
+    return len(_worker_chunker.process_repository(repo_path))
@@ -4,14 +4,35 @@ Features: Shared storage, commit tracking, smart caching
 """
 import os
 import base64
+import hashlib
 import json
+import tarfile
 from datetime import datetime
 from typing import Optional, Dict, List
 from google.cloud import storage
 import requests
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
+from urllib3.exceptions import HTTPError as Urllib3HTTPError
 import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from ..utils.storage_utils import create_storage_client
+
+# Files larger than this are left out of ingestion (generated bundles, data dumps)
+MAX_FILE_SIZE = int(os.environ.get('INGEST_MAX_FILE_SIZE', 2 * 1024 * 1024))
+
+CODE_EXTENSIONS = {
+    '.py', '.js', '.ts', '.tsx', '.jsx', '.java', '.cpp', '.c', '.h',
+    '.go', '.rs', '.rb', '.php', '.swift', '.kt', '.scala', '.sql',
+    '.md', '.yaml', '.yml', '.json', '.xml', '.html', '.css', '.scss'
+}
+
+EXCLUDE_PATHS = {
+    'node_modules', 'venv', 'env', '__pycache__', '.git',
+    'dist', 'build', 'target', '.next', 'coverage', '.pytest_cache'
+}
 
 
 class GitHubIngester:
@@ -21,7 +42,8 @@ class GitHubIngester:
     Multiple users can ingest the same repo - chunks stored once and shared
     """
     
-    def __init__(self, project_id: str, bucket_name: str, github_token: Optional[str] = None):
+    def __init__(self, project_id: str, bucket_name: str, github_token: Optional[str] = None,
+                 storage_client: Optional[storage.Client] = None):
         """
         Initialize the ingester
         
@@ -29,16 +51,19 @@ class GitHubIngester:
             project_id: GCP project ID
             bucket_name: Cloud Storage bucket for raw files
             github_token: GitHub personal access token (optional)
+            storage_client: Existing Cloud Storage client to reuse (optional)
         """
         self.project_id = project_id
         self.bucket_name = bucket_name
         self.github_token = github_token
-        self.storage_client = storage.Client(project=project_id)
+        self.storage_client = storage_client or create_storage_client(project_id)
         
         self.headers = {}
         if github_token:
             self.headers['Authorization'] = f'token {github_token}'
         
+        self.fetch_threads = int(os.environ.get('INGEST_FETCH_THREADS', 16))  # concurrent file fetches
+        self.upload_threads = int(os.environ.get('INGEST_UPLOAD_THREADS', 16))  # concurrent GCS uploads
         self.session = self._create_retry_session()
     
     def _create_retry_session(self, retries: int = 3) -> requests.Session:
@@ -52,7 +77,9 @@ class GitHubIngester:
             allowed_methods=["HEAD", "GET", "OPTIONS"]
         )
         
-        adapter = HTTPAdapter(max_retries=retry_strategy)
+        pool_size = max(10, self.fetch_threads)
+        adapter = HTTPAdapter(max_retries=retry_strategy, pool_connections=pool_size,
+                              pool_maxsize=pool_size)
         session.mount("https://", adapter)
         session.mount("http://", adapter)
         
@@ -140,17 +167,29 @@ class GitHubIngester:
             print(f"   Author: {current_commit_author}")
             print(f"   Message: {current_commit_message[:60]}")
             
-            # Fetch repository tree
-            tree_url = f'https://api.github.com/repos/{repo_full_name}/git/trees/{target_branch}?recursive=1'
-            tree_response = self._make_github_request(tree_url)
-            tree = tree_response.get('tree', [])
-            
-            # Filter for code files
-            code_files = self._filter_code_files(tree)
-            print(f"📁 Found {len(code_files)} code files to process")
+            # Files whose blob SHA is unchanged since the last ingest are reused as-is
+            previous_files = self._load_previous_files(repo_path)
             
-            # Process and upload files
-            files_metadata = self._process_files(owner, repo, code_files, repo_path, target_branch)
+            # Download the whole commit as one tarball; fall back to per-file fetches
+            try:
+                files_metadata = self._process_tarball(owner, repo, repo_path, current_commit_sha,
+                                                       previous_files)
+            except (requests.exceptions.RequestException, Urllib3HTTPError,
+                    tarfile.TarError, EOFError) as e:
+                print(f"⚠️  Tarball download failed, fetching files individually: {str(e)[:100]}")
+                
+                # Fetch repository tree
+                tree_url = f'https://api.github.com/repos/{repo_full_name}/git/trees/{target_branch}?recursive=1'
+                tree_response = self._make_github_request(tree_url)
+                tree = tree_response.get('tree', [])
+                
+                # Filter for code files
+                code_files = self._filter_code_files(tree)
+                print(f"📁 Found {len(code_files)} code files to process")
+                
+                # Process and upload files
+                files_metadata = self._process_files(owner, repo, code_files, repo_path, target_branch,
+                                                     previous_files)
             
             # Create comprehensive metadata
             metadata = {
@@ -207,117 +246,230 @@ class GitHubIngester:
             owner, repo = repo_url.split('/')
         return owner, repo
     
-    def _filter_code_files(self, tree: List[Dict]) -> List[Dict]:
-        """Filter for code files only"""
-        code_extensions = {
-            '.py', '.js', '.ts', '.tsx', '.jsx', '.java', '.cpp', '.c', '.h',
-            '.go', '.rs', '.rb', '.php', '.swift', '.kt', '.scala', '.sql',
-            '.md', '.yaml', '.yml', '.json', '.xml', '.html', '.css', '.scss'
-        }
+    def _is_code_file(self, path: str, size: int) -> bool:
+        """Check whether a repository file should be ingested"""
+        if any(excluded in path for excluded in EXCLUDE_PATHS):
+            return False
         
-        exclude_paths = {
-            'node_modules', 'venv', 'env', '__pycache__', '.git',
-            'dist', 'build', 'target', '.next', 'coverage', '.pytest_cache'
-        }
-        
-        filtered = []
-        for item in tree:
-            if item['type'] != 'blob':
-                continue
-            
-            path = item['path']
-            
-            if any(excluded in path for excluded in exclude_paths):
-                continue
-            
-            ext = '.' + path.split('.')[-1] if '.' in path else ''
-            if ext.lower() in code_extensions:
-                filtered.append(item)
+        if size > MAX_FILE_SIZE:
+            return False
         
-        return filtered
+        ext = '.' + path.split('.')[-1] if '.' in path else ''
+        return ext.lower() in CODE_EXTENSIONS
+    
+    def _filter_code_files(self, tree: List[Dict]) -> List[Dict]:
+        """Filter for code files only"""
+        return [
+            item for item in tree
+            if item['type'] == 'blob' and self._is_code_file(item['path'], item.get('size', 0))
+        ]
     
     def _process_files(self, owner: str, repo: str, files: List[Dict], 
-                      repo_path: str, branch: str) -> List[Dict]:
-        """Process and upload files using PyGithub"""
-        from github import Github
-        
-        print(f"Initializing GitHub client...")
-        github_client = Github(self.github_token) if self.github_token else Github()
-        
-        try:
-            gh_repo = github_client.get_repo(f"{owner}/{repo}")
-            print(f"✓ Connected to repo, using branch: {branch}")
-        except Exception as e:
-            print(f"❌ Failed to connect to repo: {e}")
-            raise
-        
+                      repo_path: str, branch: str,
+                      previous_files: Optional[Dict[str, Dict]] = None) -> List[Dict]:
+        """Process and upload files using the Git Data blobs API"""
+        previous_files = previous_files or {}
+        pool_size = max(1, self.fetch_threads)
         bucket = self.storage_client.bucket(self.bucket_name)
+        blobs_url = f'https://api.github.com/repos/{owner}/{repo}/git/blobs'
         files_metadata = []
         skipped = 0
         
         print(f"\nProcessing {len(files)} files from branch '{branch}'...")
         
-        for idx, item in enumerate(files, 1):
-            try:
-                file_path = item['path']
-                
-                # Get file content from SPECIFIED BRANCH
-                try:
-                    file_content = gh_repo.get_contents(file_path, ref=branch)
-                except Exception as e:
-                    print(f"⚠️  Could not fetch {file_path}: {str(e)[:60]}")
-                    skipped += 1
-                    continue
-                
-                if file_content.type != 'file':
-                    continue
-                
-                # Decode content
-                try:
-                    content = file_content.decoded_content.decode('utf-8')
-                except UnicodeDecodeError:
-                    try:
-                        content = file_content.decoded_content.decode('utf-8', errors='ignore')
-                    except Exception:
-                        skipped += 1
-                        continue
-                
-                if not content or len(content.strip()) == 0:
-                    skipped += 1
-                    continue
-                
-                if '\x00' in content:
+        def process(item: Dict) -> Optional[Dict]:
+            return self._process_file(blobs_url, bucket, item, repo_path, previous_files)
+        
+        # Fetches are pure network waits, so overlap them; map() keeps tree order
+        with ThreadPoolExecutor(max_workers=pool_size) as executor:
+            for idx, file_metadata in enumerate(executor.map(process, files), 1):
+                if file_metadata is None:
                     skipped += 1
-                    continue
-                
-                # Upload to Cloud Storage
-                blob_path = f"{repo_path}/{file_path}"
-                blob = bucket.blob(blob_path)
-                blob.upload_from_string(content)
-                
-                files_metadata.append({
-                    'path': file_path,
-                    'size': len(content),
-                    'blob_path': blob_path,
-                    'language': self._detect_language(file_path),
-                    'sha': file_content.sha
-                })
+                else:
+                    files_metadata.append(file_metadata)
                 
                 if idx % 10 == 0 or idx == len(files):
                     print(f"✓ Processed {idx}/{len(files)} files ({len(files_metadata)} successful, {skipped} skipped)")
-                    
-            except Exception as e:
-                print(f"⚠️  Error processing {item['path']}: {str(e)[:100]}")
-                skipped += 1
-                continue
         
         print(f"\n✅ Processing summary:")
         print(f"   Total: {len(files)}")
         print(f"   Success: {len(files_metadata)}")
+        print(f"   Unchanged: {self._count_unchanged(files_metadata, previous_files)}")
         print(f"   Skipped: {skipped}")
         
         return files_metadata
     
+    def _process_tarball(self, owner: str, repo: str, repo_path: str, ref: str,
+                         previous_files: Optional[Dict[str, Dict]] = None) -> List[Dict]:
+        """
+        Process and upload files from a single tarball of the repository
+        
+        One API call replaces one call per file. The archive is read as a
+        stream, so it is never held in memory or written to disk.
+        """
+        previous_files = previous_files or {}
+        tarball_url = f'https://api.github.com/repos/{owner}/{repo}/tarball/{ref}'
+        upload_threads = max(1, self.upload_threads)
+        bucket = self.storage_client.bucket(self.bucket_name)
+        files_metadata = []
+        skipped = 0
+        total = 0
+        
+        def collect(future):
+            nonlocal skipped
+            file_metadata = future.result()
+            if file_metadata is None:
+                skipped += 1
+            else:
+                files_metadata.append(file_metadata)
+            
+            done = len(files_metadata) + skipped
+            if done % 10 == 0:
+                print(f"✓ Processed {done} files ({len(files_metadata)} successful, {skipped} skipped)")
+        
+        print(f"\nDownloading tarball for {ref[:8]}...")
+        
+        # Uploads run on a pool while the stream keeps being read; the number of
+        # pending uploads is capped so file contents don't pile up in memory
+        pending = deque()
+        with ThreadPoolExecutor(max_workers=upload_threads) as executor:
+            with self.session.get(tarball_url, headers=self.headers, stream=True, timeout=60) as response:
+                response.raise_for_status()
+                
+                with tarfile.open(fileobj=response.raw, mode='r|gz') as tar:
+                    for member in tar:
+                        if not member.isfile():
+                            continue
+                        
+                        # Members are nested under a single "{owner}-{repo}-{sha}/" directory
+                        file_path = member.name.split('/', 1)[-1]
+                        if not self._is_code_file(file_path, member.size):
+                            continue
+                        
+                        total += 1
+                        raw = tar.extractfile(member).read()
+                        pending.append(executor.submit(self._upload_file, bucket, file_path, raw,
+                                                       repo_path, previous_files))
+                        
+                        if len(pending) >= 2 * upload_threads:
+                            collect(pending.popleft())
+            
+            while pending:
+                collect(pending.popleft())
+        
+        print(f"\n✅ Processing summary:")
+        print(f"   Total: {total}")
+        print(f"   Success: {len(files_metadata)}")
+        print(f"   Unchanged: {self._count_unchanged(files_metadata, previous_files)}")
+        print(f"   Skipped: {skipped}")
+        
+        return files_metadata
+    
+    def _fetch_blob(self, blobs_url: str, sha: str) -> bytes:
+        """
+        Fetch raw file bytes by blob SHA
+        
+        The tree already names every file's blob, so this skips the path
+        lookup done by the contents API and is not capped at 1 MB. The raw
+        media type returns the bytes directly instead of base64 JSON.
+        """
+        headers = {**self.headers, 'Accept': 'application/vnd.github.raw+json'}
+        response = self.session.get(f'{blobs_url}/{sha}', headers=headers, timeout=30)
+        response.raise_for_status()
+        
+        if response.headers.get('Content-Type', '').startswith('application/json'):
+            return base64.b64decode(response.json()['content'])
+        return response.content
+    
+    def _process_file(self, blobs_url: str, bucket: storage.Bucket, item: Dict,
+                      repo_path: str, previous_files: Dict[str, Dict]) -> Optional[Dict]:
+        """
+        Fetch one file from GitHub and upload it to Cloud Storage
+        
+        Runs on a worker thread. Returns the file's metadata entry, or None
+        if the file was skipped. A file with the same blob SHA as in the
+        previous ingest is not fetched at all; its stored copy is kept.
+        """
+        file_path = item['path']
+        
+        previous = previous_files.get(file_path)
+        if previous and previous.get('sha') == item['sha']:
+            return previous
+        
+        try:
+            raw = self._fetch_blob(blobs_url, item['sha'])
+        except Exception as e:
+            print(f"⚠️  Could not fetch {file_path}: {str(e)[:60]}")
+            return None
+        
+        return self._upload_file(bucket, file_path, raw, repo_path, sha=item['sha'])
+    
+    def _upload_file(self, bucket: storage.Bucket, file_path: str, raw: bytes,
+                     repo_path: str, previous_files: Optional[Dict[str, Dict]] = None,
+                     sha: Optional[str] = None) -> Optional[Dict]:
+        """
+        Decode file bytes and upload them to Cloud Storage
+        
+        Returns the file's metadata entry, or None if the file is empty,
+        binary or failed to upload. Files unchanged since the previous
+        ingest are not uploaded again.
+        """
+        if sha is None:
+            # Same object ID git (and the tree API) assigns to this blob
+            sha = hashlib.sha1(b'blob %d\0' % len(raw) + raw).hexdigest()
+        
+        previous = (previous_files or {}).get(file_path)
+        if previous and previous.get('sha') == sha:
+            return previous
+        
+        try:
+            # Decode content
+            try:
+                content = raw.decode('utf-8')
+            except UnicodeDecodeError:
+                content = raw.decode('utf-8', errors='ignore')
+            
+            if not content or len(content.strip()) == 0:
+                return None
+            
+            if '\x00' in content:
+                return None
+            
+            # Upload to Cloud Storage
+            blob_path = f"{repo_path}/{file_path}"
+            blob = bucket.blob(blob_path)
+            blob.upload_from_string(content)
+            
+            return {
+                'path': file_path,
+                'size': len(content),
+                'blob_path': blob_path,
+                'language': self._detect_language(file_path),
+                'sha': sha
+            }
+            
+        except Exception as e:
+            print(f"⚠️  Error processing {file_path}: {str(e)[:100]}")
+            return None
+    
+    def _load_previous_files(self, repo_path: str) -> Dict[str, Dict]:
+        """Load the file entries of the last ingest, keyed by path"""
+        blob = self.storage_client.bucket(self.bucket_name).blob(f"{repo_path}/metadata.json")
+        if not blob.exists():
+            return {}
+        
+        try:
+            previous = json.loads(blob.download_as_bytes())
+        except Exception as e:
+            print(f"⚠️  Could not read previous metadata: {str(e)[:100]}")
+            return {}
+        
+        return {f['path']: f for f in previous.get('files', []) if f.get('sha')}
+    
+    def _count_unchanged(self, files_metadata: List[Dict], previous_files: Dict[str, Dict]) -> int:
+        """Count entries reused from the previous ingest"""
+        return sum(1 for f in files_metadata if previous_files.get(f['path']) is f)
+    
     def _detect_language(self, file_path: str) -> str:
         """Detect programming language from file extension"""
         extensions = {
@@ -18,9 +18,10 @@ class RAGServices:
     """
     
     def __init__(self, project_id: str, bucket_processed: str,
-                 enable_github: bool = True, enable_local_save: bool = True):
-        self.llm = GeminiClient(project_id)
-        self.search = VectorSearch(project_id, bucket_processed)
+                 enable_github: bool = True, enable_local_save: bool = True,
+                 llm: Optional[GeminiClient] = None, search: Optional[VectorSearch] = None):
+        self.llm = llm or GeminiClient(project_id)
+        self.search = search or VectorSearch(project_id, bucket_processed)
         self.project_id = project_id
         self.bucket_name = bucket_processed
         
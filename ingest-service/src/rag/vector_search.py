@@ -15,8 +15,9 @@ from google.auth import default as get_default_credentials
 class VectorSearch:
     """Fast semantic search using Vertex AI embeddings"""
     
-    def __init__(self, project_id: str, bucket_name: str,location: str = 'us-east1'):
-        self.client = storage.Client(project=project_id)
+    def __init__(self, project_id: str, bucket_name: str,location: str = 'us-east1',
+                 storage_client: Optional[storage.Client] = None):
+        self.client = storage_client or storage.Client(project=project_id)
         self.bucket_name = bucket_name
         self.bucket = self.client.bucket(bucket_name)
         self.project_id = project_id
@@ -5,7 +5,10 @@ from .storage_utils import (
     get_shared_repo_path,
     get_user_metadata_path,
     UserRepoAccess,
-    parse_repo_path
+    parse_repo_path,
+    iter_jsonl_blob,
+    write_jsonl_blob,
+    create_storage_client
 )
 from .commit_tracker import CommitTracker
 from .file_manager import DocumentationManager
@@ -16,5 +19,8 @@ __all__ = [
     'UserRepoAccess',
     'CommitTracker',
     'DocumentationManager',
-    'parse_repo_path'
+    'parse_repo_path',
+    'iter_jsonl_blob',
+    'write_jsonl_blob',
+    'create_storage_client'
 ]
\ No newline at end of file
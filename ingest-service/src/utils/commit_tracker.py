@@ -4,9 +4,15 @@ Track commits for auto-update detection and incremental processing
 from google.cloud import storage
 from typing import Optional, Dict, Tuple, List
 import json
+import threading
+import time
 from datetime import datetime
 from .storage_utils import get_shared_repo_path
 
+# Upper bound on cached last-commit lookups; expired entries are dropped first,
+# then the oldest
+COMMIT_CACHE_MAX_SIZE = 1024
+
 
 class CommitTracker:
     """
@@ -14,12 +20,20 @@ class CommitTracker:
     - Incremental updates (only process if new commits)
     - Commit history
     - Auto-update detection
+    
+    With cache_ttl set, last-commit lookups are served from memory for that
+    many seconds (at most COMMIT_CACHE_MAX_SIZE repos); saving commit info
+    refreshes the cached entry.
     """
     
-    def __init__(self, project_id: str, bucket_name: str):
-        self.client = storage.Client(project=project_id)
+    def __init__(self, project_id: str, bucket_name: str, cache_ttl: float = 0,
+                 storage_client: Optional[storage.Client] = None):
+        self.client = storage_client or storage.Client(project=project_id)
         self.bucket_name = bucket_name
         self.bucket = self.client.bucket(bucket_name)
+        self.cache_ttl = cache_ttl
+        self._commit_cache: Dict[str, Tuple[float, Optional[Dict]]] = {}
+        self._commit_cache_lock = threading.Lock()
     
     def get_last_commit(self, repo_full_name: str) -> Optional[Dict]:
         """
@@ -31,6 +45,33 @@ class CommitTracker:
         Returns:
             Dict with commit_sha, branch, author, processed_at
         """
+        if self.cache_ttl:
+            cached = self._commit_cache.get(repo_full_name)
+            if cached and cached[0] > time.monotonic():
+                return cached[1]
+        
+        commit_info = self._load_commit_info(repo_full_name)
+        
+        self._cache_commit_info(repo_full_name, commit_info)
+        return commit_info
+    
+    def _cache_commit_info(self, repo_full_name: str, commit_info: Optional[Dict]):
+        """Store a lookup result, evicting expired and then oldest entries when full"""
+        if not self.cache_ttl:
+            return
+        
+        now = time.monotonic()
+        with self._commit_cache_lock:
+            self._commit_cache.pop(repo_full_name, None)
+            if len(self._commit_cache) >= COMMIT_CACHE_MAX_SIZE:
+                for key in [k for k, v in self._commit_cache.items() if v[0] <= now]:
+                    del self._commit_cache[key]
+                while len(self._commit_cache) >= COMMIT_CACHE_MAX_SIZE:
+                    del self._commit_cache[next(iter(self._commit_cache))]
+            self._commit_cache[repo_full_name] = (now + self.cache_ttl, commit_info)
+    
+    def _load_commit_info(self, repo_full_name: str) -> Optional[Dict]:
+        """Read commit_info.json from Cloud Storage"""
         repo_path = get_shared_repo_path(repo_full_name)
         blob = self.bucket.blob(f"{repo_path}/commit_info.json")
         
@@ -70,6 +111,8 @@ class CommitTracker:
         
         blob = self.bucket.blob(f"{repo_path}/commit_info.json")
         blob.upload_from_string(json.dumps(commit_info, indent=2))
+        
+        self._cache_commit_info(repo_full_name, commit_info)
         print(f"✓ Saved commit info: {commit_sha[:8]} on {branch} by {author}")
     
     def needs_update(self, repo_full_name: str, current_sha: str) -> Tuple[bool, str]:
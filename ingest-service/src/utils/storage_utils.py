@@ -2,12 +2,43 @@
 Storage utilities for multi-tenant architecture
 Implements shared chunk storage with per-user metadata
 """
-from typing import Optional, Dict, List
+from typing import Optional, Dict, List, Iterable, Iterator
+import google.auth
+from google.auth.transport.requests import AuthorizedSession
 from google.cloud import storage
+from requests.adapters import HTTPAdapter
+import os
 import json
+import orjson
 from datetime import datetime
 
 
+# Keep-alive connections per host for storage clients shared by download and
+# upload thread pools; requests' default of 10 makes extra threads reconnect
+STORAGE_HTTP_POOL_SIZE = int(os.getenv('STORAGE_HTTP_POOL_SIZE', 32))
+
+
+def create_storage_client(project_id: str, pool_size: int = STORAGE_HTTP_POOL_SIZE) -> storage.Client:
+    """
+    Create a Cloud Storage client whose HTTP session is sized for thread pools
+    
+    The pooled adapter is mounted before mTLS is configured, so a client
+    certificate adapter (when enabled) still takes precedence.
+    
+    Args:
+        project_id: GCP project ID
+        pool_size: Keep-alive connections to hold per host
+        
+    Returns:
+        Storage client backed by the pooled session
+    """
+    credentials, _ = google.auth.default(scopes=storage.Client.SCOPE)
+    session = AuthorizedSession(credentials)
+    session.mount('https://', HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size))
+    session.configure_mtls_channel()
+    return storage.Client(project=project_id, credentials=credentials, _http=session)
+
+
 def get_shared_repo_path(repo_full_name: str) -> str:
     """
     Get shared repository path (single source of truth for chunks)
@@ -41,6 +72,76 @@ def get_user_metadata_path(user_id: str, repo_full_name: str) -> str:
     return f"user_data/{user_id}/repos/{repo_full_name}"
 
 
+def iter_jsonl_blob(blob: storage.Blob) -> Iterator[Dict]:
+    """
+    Stream a JSONL blob one record at a time
+    
+    Reads through the GCS blob reader instead of downloading the whole
+    file as text, so callers can stop early without holding every line.
+    The reader has no readline/peek, so lines are split out of fixed-size
+    blocks here rather than iterating the reader (one read(1) per byte).
+    
+    Args:
+        blob: GCS blob containing one JSON object per line
+        
+    Yields:
+        Parsed JSON objects, skipping blank lines
+    """
+    with blob.open('rb', chunk_size=JSONL_READ_BLOCK_SIZE) as f:
+        for line in iter_lines(f):
+            if line.strip():
+                yield orjson.loads(line)
+
+
+# Block size for reading JSONL blobs; lines are split out of each block
+JSONL_READ_BLOCK_SIZE = 8 * 1024 * 1024
+
+
+def iter_lines(reader, block_size: int = JSONL_READ_BLOCK_SIZE) -> Iterator[bytes]:
+    """
+    Split a binary reader into lines using block reads
+    
+    Args:
+        reader: Binary file-like object with read()
+        block_size: Bytes requested per read() call
+        
+    Yields:
+        Lines without the trailing newline
+    """
+    tail = b''
+    while True:
+        block = reader.read(block_size)
+        if not block:
+            break
+        lines = (tail + block).split(b'\n')
+        tail = lines.pop()
+        yield from lines
+    if tail:
+        yield tail
+
+
+# Resumable-upload chunk size used when streaming JSONL to GCS
+JSONL_UPLOAD_CHUNK_SIZE = 8 * 1024 * 1024
+
+
+def write_jsonl_blob(blob: storage.Blob, records: Iterable[Dict]) -> None:
+    """
+    Stream records to a JSONL blob one line at a time
+    
+    Serializes each record as it is written instead of building the whole
+    file in memory, so peak memory stays around one upload chunk.
+    
+    Args:
+        blob: Destination GCS blob
+        records: JSON-serializable dicts, one per line
+    """
+    with blob.open('wb', chunk_size=JSONL_UPLOAD_CHUNK_SIZE,
+                   content_type='application/x-ndjson') as f:
+        for record in records:
+            f.write(orjson.dumps(record))
+            f.write(b'\n')
+
+
 def parse_repo_path(path: str) -> dict:
     """
     Parse a storage path to extract components